@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 # Copyright (C) 2012 by Jaehyun Yeom
 
+import codecs
 import functools
 import operator
 
@@ -239,9 +240,20 @@ def GetInitialCharacterBytes(string,
                              coding='utf-8'):
   """Wrapper function for GetInitialCharacter for (non-unicode) byte str.
 
-  This is for python 2.x only.
+  This is for python 2.x only. For UTF-8 only the first character is decoded.
   """
   if type(string) is str:
+    if string and codecs.lookup(coding).name == 'utf-8':
+      lead_byte = ord(string[0])
+      if lead_byte < 0x80:
+        length = 1
+      elif lead_byte < 0xe0:
+        length = 2
+      elif lead_byte < 0xf0:
+        length = 3
+      else:
+        length = 4
+      string = string[:length]
     unicode_string = string.decode(coding)
   else:
     unicode_string = string
@@ -136,6 +136,17 @@ class TestHangul(unittest.TestCase):
     self.assertEqual('ㄱ', hangul.GetInitialCharacterBytes('김치국'))
     self.assertEqual('ㅎ', hangul.GetInitialCharacterBytes('ㅎㅎㅎ'))
     self.assertEqual('ㅜ', hangul.GetInitialCharacterBytes('ㅜㅜ'))
+    # Only the first character is decoded from UTF-8.
+    self.assertEqual('ㅇ', hangul.GetInitialCharacterBytes('이\xff\xfe'))
+    self.assertEqual('M', hangul.GetInitialCharacterBytes('m\xff'))
+    self.assertEqual('É', hangul.GetInitialCharacterBytes('é\x80'))
+    self.assertRaises(UnicodeDecodeError, hangul.GetInitialCharacterBytes,
+                      '\xff이')
+    self.assertEqual('ㅇ'.decode('utf-8').encode('euc-kr'),
+                     hangul.GetInitialCharacterBytes(
+                       '이순신'.decode('utf-8').encode('euc-kr'),
+                       coding='euc-kr'))
+    self.assertEqual('ㅇ', hangul.GetInitialCharacterBytes(u'이순신'))
 
 if __name__ == '__main__':
   unittest.main()
@@ -2,8 +2,23 @@
 # -*- coding: utf-8 -*-
 # Copyright (C) 2012 by Jaehyun Yeom
 
+import array
+import bisect
+import codecs
+import collections
+import collections.abc
 import functools
+import itertools
+import json
+import math
+import mmap
 import operator
+import re
+import string
+import struct
+import sys
+import threading
+import time
 
 JAMO_ROMANIZATIONS = (
   # 19 Jamos
@@ -22,9 +37,471 @@ INITIAL_JAMOS = (
   'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
   'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
 
+MEDIAL_JAMOS = (
+  'ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅘ',
+  'ㅙ', 'ㅚ', 'ㅛ', 'ㅜ', 'ㅝ', 'ㅞ', 'ㅟ', 'ㅠ', 'ㅡ', 'ㅢ',
+  'ㅣ')
+
+FINAL_JAMOS = (
+  '', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ',
+  'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ',
+  'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+
+# Numbers of initial, medial and final jamos of Unicode hangul syllables.
+NUM_JAMOS = (len(INITIAL_JAMOS), len(MEDIAL_JAMOS), len(FINAL_JAMOS))
+
 FIRST_HANGUL_CHARACTER = '\uac00'
 
 
+class RomanizationScheme(object):
+  """Precompiled lookup tables for a jamo_romanizations tuple.
+
+  A scheme is hashable and compares equal to any other scheme built from the
+  same jamo_romanizations. It can be passed wherever jamo_romanizations is
+  expected. Please use CompileRomanizationScheme() to get a shared instance
+  instead of constructing one directly.
+  """
+
+  def __init__(self, jamo_romanizations, romanizations=None,
+               final_consonant_bits=None, unromanization_table=None):
+    """Build the tables which are not given.
+
+    The optional tables are for LoadRomanizationScheme(), which passes tables
+    backed by a memory-mapped file.
+    """
+    self.jamo_romanizations = tuple(tuple(jamos)
+                                    for jamos in jamo_romanizations)
+    self.num_jamos = tuple(len(jamos) for jamos in self.jamo_romanizations)
+    self.num_characters = functools.reduce(operator.mul, self.num_jamos, 1)
+    self.end_character = chr(ord(FIRST_HANGUL_CHARACTER) + self.num_characters)
+    # Romanization of every character indexed by OrdHangul().
+    if romanizations is None:
+      romanizations = tuple(''.join(jamos) for jamos in
+                            itertools.product(*self.jamo_romanizations))
+    self.romanizations = romanizations
+    # Bit OrdHangul() is set if the character has a final consonant.
+    if final_consonant_bits is None:
+      num_finals = self.num_jamos[-1]
+      final_consonant_bits = bytearray((self.num_characters + 7) // 8)
+      for hangul_index in range(self.num_characters):
+        if hangul_index % num_finals:
+          final_consonant_bits[hangul_index >> 3] |= 1 << (hangul_index & 7)
+      final_consonant_bits = bytes(final_consonant_bits)
+    self.final_consonant_bits = final_consonant_bits
+    self._translation_tables = {}
+    self._unromanization_table = unromanization_table
+    self._scanners = {}
+    self._initial_tables = {}
+    self._sort_key_tables = {}
+    # (mmap, memoryviews) of a scheme from LoadRomanizationScheme().
+    self._mapped_buffers = None
+
+  def HasFinalConsonant(self, hangul_index):
+    """Return True if the character at hangul_index has a final consonant."""
+    return bool(self.final_consonant_bits[hangul_index >> 3] >>
+                (hangul_index & 7) & 1)
+
+  def __eq__(self, other):
+    if isinstance(other, RomanizationScheme):
+      return self.jamo_romanizations == other.jamo_romanizations
+    return NotImplemented
+
+  def __hash__(self):
+    return hash(self.jamo_romanizations)
+
+  def __iter__(self):
+    return iter(self.jamo_romanizations)
+
+  def __len__(self):
+    return len(self.jamo_romanizations)
+
+  def __getitem__(self, index):
+    return self.jamo_romanizations[index]
+
+  def __repr__(self):
+    return 'RomanizationScheme(%r)' % (self.jamo_romanizations,)
+
+  def Close(self):
+    """Unmap the file of a scheme from LoadRomanizationScheme().
+
+    The scheme is unregistered and cannot be used afterwards. This does
+    nothing for other schemes.
+    """
+    if self._mapped_buffers is None:
+      return
+    if _ROMANIZATION_SCHEMES.get(self.jamo_romanizations) is self:
+      del _ROMANIZATION_SCHEMES[self.jamo_romanizations]
+    mapped, views = self._mapped_buffers
+    self._mapped_buffers = None
+    for view in reversed(views):
+      view.release()
+    mapped.close()
+
+  def TranslationTable(self, prefix='[', postfix=']'):
+    """Return a str.translate() table with prefix and postfix baked in.
+
+    Characters romanized to an empty string are left out of the table so that
+    they are kept as they are.
+    """
+    key = (prefix, postfix)
+    table = self._translation_tables.get(key)
+    if table is None and self._mapped_buffers is not None:
+      table = self._translation_tables[key] = _MappedTranslationTable(
+        self.romanizations, prefix, postfix)
+    elif table is None:
+      first_ord = ord(FIRST_HANGUL_CHARACTER)
+      table = dict((first_ord + hangul_index, prefix + romanized + postfix)
+                   for hangul_index, romanized in enumerate(self.romanizations)
+                   if romanized)
+      self._translation_tables[key] = table
+    return table
+
+  def UnromanizationTable(self):
+    """Return a dict from romanized characters to hangul characters.
+
+    The table agrees with the greedy longest jamo match of UnromanizeHangul():
+    a romanization which the greedy match cannot split back to jamos is left
+    out even if it is a romanization of some character.
+    """
+    if self._unromanization_table is None:
+      jamo_tables = []
+      for jamos in self.jamo_romanizations:
+        # Later jamos win over earlier ones with the same romanization.
+        jamo_table = dict((jamo, jamo_index)
+                          for jamo_index, jamo in enumerate(jamos))
+        jamo_tables.append((jamo_table, max(len(jamo) for jamo in jamos)))
+      table = {}
+      for romanized in self.romanizations:
+        if romanized in table:
+          continue
+        jamo_indexes = _MatchJamos(romanized, jamo_tables)
+        if jamo_indexes is not None:
+          table[romanized] = ChrHangul(
+            ComposeHangulIndex(jamo_indexes, self.num_jamos))
+      self._unromanization_table = table
+    return self._unromanization_table
+
+  def InitialTable(self, initial_jamos=INITIAL_JAMOS):
+    """Return a str.translate() table from characters to initial jamos."""
+    initial_jamos = tuple(initial_jamos)
+    table = self._initial_tables.get(initial_jamos)
+    if table is None:
+      first_ord = ord(FIRST_HANGUL_CHARACTER)
+      num_per_initial = self.num_characters // self.num_jamos[0]
+      table = dict((first_ord + hangul_index,
+                    initial_jamos[hangul_index // num_per_initial])
+                   for hangul_index in range(self.num_characters))
+      self._initial_tables[initial_jamos] = table
+    return table
+
+  def SortKeyTable(self, initial_jamos=INITIAL_JAMOS):
+    """Return a str.translate() table from characters to sort key bytes.
+
+    See HangulSortKey() for the order. Keys are strings of code points below
+    256 so that they can be encoded to bytes with latin-1.
+    """
+    initial_jamos = tuple(initial_jamos)
+    table = self._sort_key_tables.get(initial_jamos)
+    if table is None:
+      table = _SortKeyTable()
+      first_ord = ord(FIRST_HANGUL_CHARACTER)
+      for hangul_index in range(self.num_characters):
+        jamo_indexes = DecomposeHangulIndex(hangul_index, self.num_jamos)
+        table[first_ord + hangul_index] = _SORT_KEY_HANGUL + ''.join(
+          chr(jamo_index + 1) for jamo_index in jamo_indexes)
+      # A lone jamo sorts right before the characters starting with it.
+      for initial, jamo in enumerate(initial_jamos):
+        table[ord(jamo)] = _SORT_KEY_HANGUL + chr(initial + 1) + '\0\0'
+      if self.num_jamos[1] == len(MEDIAL_JAMOS) and 'ㅇ' in initial_jamos:
+        silent_initial = chr(initial_jamos.index('ㅇ') + 1)
+        for medial, jamo in enumerate(MEDIAL_JAMOS):
+          table[ord(jamo)] = (_SORT_KEY_HANGUL + silent_initial +
+                              chr(medial + 1) + '\0')
+      self._sort_key_tables[initial_jamos] = table
+    return table
+
+  def Scanner(self, prefix='[', postfix=']'):
+    """Return a compiled regex matching a prefix ... postfix span.
+
+    The span is the text between the last prefix before a postfix and the
+    postfix itself, which is captured as group 1.
+    """
+    key = (prefix, postfix)
+    scanner = self._scanners.get(key)
+    if scanner is None:
+      quoted_prefix = re.escape(prefix)
+      quoted_postfix = re.escape(postfix)
+      if len(prefix) == 1 and len(postfix) == 1:
+        start = quoted_prefix
+        body = '[^%s%s]*' % (quoted_prefix, quoted_postfix)
+      else:
+        # No other prefix may start inside the prefix, so that <<<ga>> is
+        # matched from its second <.
+        start = '(?=%s).(?:(?!%s).){%d}' % (quoted_prefix, quoted_prefix,
+                                            len(prefix) - 1)
+        body = '(?:(?!%s|%s).)*' % (quoted_prefix, quoted_postfix)
+      scanner = re.compile('%s(%s)%s' % (start, body, quoted_postfix),
+                           re.DOTALL)
+      self._scanners[key] = scanner
+    return scanner
+
+
+def _MatchJamos(romanized, jamo_tables):
+  """Split romanized to jamo indexes, taking the longest jamo each time."""
+  jamo_indexes = []
+  for jamo_table, max_length in jamo_tables:
+    for length in range(min(max_length, len(romanized)), -1, -1):
+      jamo_index = jamo_table.get(romanized[:length])
+      if jamo_index is not None:
+        break
+    else:
+      return None
+    jamo_indexes.append(jamo_index)
+    romanized = romanized[length:]
+  if romanized:
+    return None
+  return tuple(jamo_indexes)
+
+
+_SORT_KEY_SPACE = '\1'
+_SORT_KEY_HANGUL = '\2'
+_SORT_KEY_LATIN = '\3'
+_SORT_KEY_DIGIT = '\4'
+_SORT_KEY_OTHER = '\5'
+
+
+class _SortKeyTable(dict):
+  """Sort key table which fills in keys for non-hangul characters."""
+
+  def __missing__(self, character_ord):
+    character = chr(character_ord)
+    if character.isspace():
+      key = _SORT_KEY_SPACE
+    elif character in string.ascii_letters:
+      key = _SORT_KEY_LATIN + character.lower()
+    elif '0' <= character <= '9':
+      key = _SORT_KEY_DIGIT + character
+    else:
+      key = _SORT_KEY_OTHER + ''.join(
+        chr(byte) for byte in character_ord.to_bytes(3, 'big'))
+    self[character_ord] = key
+    return key
+
+
+_ROMANIZATION_SCHEMES = {}
+
+
+def CompileRomanizationScheme(jamo_romanizations=JAMO_ROMANIZATIONS):
+  """Return the shared RomanizationScheme for jamo_romanizations.
+
+  Schemes are built once and cached, so calling this repeatedly with the same
+  jamo_romanizations is cheap.
+  """
+  if isinstance(jamo_romanizations, RomanizationScheme):
+    return jamo_romanizations
+  try:
+    return _ROMANIZATION_SCHEMES[jamo_romanizations]
+  except KeyError:
+    pass
+  except TypeError:
+    # Lists are looked up by their tuple form.
+    jamo_romanizations = tuple(tuple(jamos) for jamos in jamo_romanizations)
+    scheme = _ROMANIZATION_SCHEMES.get(jamo_romanizations)
+    if scheme is not None:
+      return scheme
+  scheme = RomanizationScheme(jamo_romanizations)
+  scheme = _ROMANIZATION_SCHEMES.setdefault(scheme.jamo_romanizations, scheme)
+  _ROMANIZATION_SCHEMES.setdefault(jamo_romanizations, scheme)
+  return scheme
+
+
+_SCHEME_FILE_MAGIC = b'PYHANGUL'
+
+
+class _MappedStrings(collections.abc.Sequence):
+  """Sequence of UTF-8 strings stored in a buffer with an offset array."""
+
+  def __init__(self, offsets, data):
+    self._offsets = offsets
+    self._data = data
+
+  def __len__(self):
+    return len(self._offsets) - 1
+
+  def __getitem__(self, index):
+    if index < 0:
+      index += len(self)
+    if not 0 <= index < len(self):
+      raise IndexError('index out of range')
+    return str(self._data[self._offsets[index]:self._offsets[index + 1]],
+               'utf-8')
+
+
+class _MappedTranslationTable(dict):
+  """Translation table which decodes romanizations as characters are seen.
+
+  Characters without a romanization map to themselves, so that get() and
+  str.translate() agree without building the whole table.
+  """
+
+  def __init__(self, romanizations, prefix, postfix):
+    super().__init__()
+    self._romanizations = romanizations
+    self._prefix = prefix
+    self._postfix = postfix
+
+  def __missing__(self, character_ord):
+    hangul_index = character_ord - ord(FIRST_HANGUL_CHARACTER)
+    romanized = ''
+    if 0 <= hangul_index < len(self._romanizations):
+      romanized = self._romanizations[hangul_index]
+    if romanized:
+      translated = self._prefix + romanized + self._postfix
+    else:
+      translated = chr(character_ord)
+    self[character_ord] = translated
+    return translated
+
+  def get(self, character_ord, default=None):
+    return self[character_ord]
+
+
+class _MappedUnromanizationTable(collections.abc.Mapping):
+  """Unromanization table searching hangul indexes sorted by romanization."""
+
+  def __init__(self, romanizations, sorted_indexes):
+    self._romanizations = romanizations
+    self._sorted_indexes = sorted_indexes
+    # Characters found so far, so that each is searched and decoded once.
+    self._characters = {}
+
+  def __len__(self):
+    return len(self._sorted_indexes)
+
+  def __iter__(self):
+    for hangul_index in self._sorted_indexes:
+      yield self._romanizations[hangul_index]
+
+  def __getitem__(self, romanized):
+    try:
+      return self._characters[romanized]
+    except KeyError:
+      pass
+    romanizations = self._romanizations
+    sorted_indexes = self._sorted_indexes
+    low, high = 0, len(sorted_indexes)
+    while low < high:
+      middle = (low + high) // 2
+      if romanizations[sorted_indexes[middle]] < romanized:
+        low = middle + 1
+      else:
+        high = middle
+    if (low < len(sorted_indexes) and
+        romanizations[sorted_indexes[low]] == romanized):
+      character = self._characters[romanized] = ChrHangul(sorted_indexes[low])
+      return character
+    raise KeyError(romanized)
+
+
+def SaveRomanizationScheme(path, jamo_romanizations=JAMO_ROMANIZATIONS):
+  """Save the compiled tables of a scheme to a binary file.
+
+  The file can be loaded by LoadRomanizationScheme() on a machine with the
+  same byte order.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  encoded = [romanized.encode('utf-8') for romanized in scheme.romanizations]
+  offsets = array.array('I', [0])
+  for romanized in encoded:
+    offsets.append(offsets[-1] + len(romanized))
+  sorted_indexes = array.array('I', (
+    OrdHangul(character)
+    for _, character in sorted(scheme.UnromanizationTable().items())))
+  sections = (('final_consonant_bits', bytes(scheme.final_consonant_bits)),
+              ('romanization_offsets', offsets.tobytes()),
+              ('unromanization_indexes', sorted_indexes.tobytes()),
+              ('romanizations', b''.join(encoded)))
+
+  header = {'jamo_romanizations': scheme.jamo_romanizations,
+            'byteorder': sys.byteorder, 'sections': {}}
+  position = 0
+  for name, data in sections:
+    header['sections'][name] = (position, len(data))
+    # Keep arrays aligned.
+    position += (len(data) + 7) // 8 * 8
+  header = json.dumps(header).encode('utf-8')
+  header += b' ' * (-len(header) % 8)
+  with open(path, 'wb') as scheme_file:
+    scheme_file.write(_SCHEME_FILE_MAGIC)
+    scheme_file.write(struct.pack('<Q', len(header)))
+    scheme_file.write(header)
+    for name, data in sections:
+      scheme_file.write(data)
+      scheme_file.write(b'\0' * (-len(data) % 8))
+
+
+def LoadRomanizationScheme(path, register=False):
+  """Load a scheme saved by SaveRomanizationScheme().
+
+  The file is memory-mapped and read lazily, so processes loading the same
+  file share its pages instead of building their own tables. Lookups decode
+  the file as they go, which is slower than a compiled scheme, so this pays
+  off for memory rather than speed. Translation tables of the scheme are
+  filled in as characters are romanized instead of holding every character.
+  Call Close() on the scheme to unmap the file.
+
+  Args:
+    register: Make CompileRomanizationScheme() return the loaded scheme for
+        its jamo_romanizations, so that every function in this module uses
+        it.
+
+  Returns:
+    RomanizationScheme backed by the file.
+  """
+  with open(path, 'rb') as scheme_file:
+    mapped = mmap.mmap(scheme_file.fileno(), 0, access=mmap.ACCESS_READ)
+  view = memoryview(mapped)
+  views = [view]
+
+  def Section(name, typecode='B'):
+    offset, length = header['sections'][name]
+    section = view[data_start + offset:data_start + offset + length]
+    views.append(section)
+    if typecode != 'B':
+      section = section.cast(typecode)
+      views.append(section)
+    return section
+
+  try:
+    if bytes(view[:len(_SCHEME_FILE_MAGIC)]) != _SCHEME_FILE_MAGIC:
+      raise ValueError('%s is not a romanization scheme file' % path)
+    data_start = len(_SCHEME_FILE_MAGIC) + 8
+    header_length, = struct.unpack('<Q', view[len(_SCHEME_FILE_MAGIC):
+                                              data_start])
+    header = json.loads(str(view[data_start:data_start + header_length],
+                            'utf-8'))
+    if header['byteorder'] != sys.byteorder:
+      raise ValueError('%s was saved with %s endian byte order' %
+                       (path, header['byteorder']))
+    data_start += header_length
+    romanizations = _MappedStrings(Section('romanization_offsets', 'I'),
+                                   Section('romanizations'))
+    scheme = RomanizationScheme(
+      header['jamo_romanizations'], romanizations=romanizations,
+      final_consonant_bits=Section('final_consonant_bits'),
+      unromanization_table=_MappedUnromanizationTable(
+        romanizations, Section('unromanization_indexes', 'I')))
+  except BaseException:
+    for section in reversed(views):
+      section.release()
+    mapped.close()
+    raise
+  scheme._mapped_buffers = (mapped, views)
+  if register:
+    _ROMANIZATION_SCHEMES[scheme.jamo_romanizations] = scheme
+  return scheme
+
+
 def OrdHangul(hangul_character):
   """Return the integer index of hangul character, starting from 0 for [ga]."""
   return ord(hangul_character) - ord(FIRST_HANGUL_CHARACTER)
@@ -87,13 +564,11 @@ def DecomposeHangul(hangul_character, jamo_romanizations):
     Tuple of jamo indexes like (x, y, z) if hangul_character is
     hangul, None otherwise.
   """
-  num_jamos = tuple(len(jamos) for jamos in jamo_romanizations)
-  num_characters = functools.reduce(operator.mul, num_jamos, 1)
-  end_character = chr(ord(FIRST_HANGUL_CHARACTER) + num_characters)
+  scheme = CompileRomanizationScheme(jamo_romanizations)
   if (hangul_character >= FIRST_HANGUL_CHARACTER and
-      hangul_character < end_character):
+      hangul_character < scheme.end_character):
     hangul_index = OrdHangul(hangul_character)
-    return DecomposeHangulIndex(hangul_index, num_jamos)
+    return DecomposeHangulIndex(hangul_index, scheme.num_jamos)
   return None
 
 
@@ -108,93 +583,651 @@ def ComposeHangul(jamo_indexes, jamo_romanizations):
   Returns:
     A hangul character.
   """
-  num_jamos = tuple(len(jamos) for jamos in jamo_romanizations)
-  hangul_index = ComposeHangulIndex(jamo_indexes, num_jamos)
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  hangul_index = ComposeHangulIndex(jamo_indexes, scheme.num_jamos)
   return ChrHangul(hangul_index)
 
 
 def RomanizeHangul(hangul_character, jamo_romanizations):
   """Romanize a single hangul character."""
-  hangul_indexes = DecomposeHangul(hangul_character, jamo_romanizations)
-  if hangul_indexes:
-    return ''.join(jamos[index]
-                   for index, jamos in zip(hangul_indexes, jamo_romanizations))
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  if (hangul_character >= FIRST_HANGUL_CHARACTER and
+      hangul_character < scheme.end_character):
+    return scheme.romanizations[OrdHangul(hangul_character)]
   return None
 
 
 def UnromanizeHangul(romanized_character, jamo_romanizations):
-  """Unromanize a single hangul character."""
-  jamo_indexes = []
-  for jamo_romanization in jamo_romanizations:
-    matched_jamo = ''
-    matched_jamo_index = -1
-    for jamo_index, jamo in enumerate(jamo_romanization):
-      if (romanized_character.startswith(jamo) and
-          len(jamo) >= len(matched_jamo)):
-        matched_jamo = jamo
-        matched_jamo_index = jamo_index
-    if matched_jamo_index == -1:
-      return None
-    jamo_indexes.append(matched_jamo_index)
-    romanized_character = romanized_character[len(matched_jamo):]
-  if romanized_character:
-    return None
-  return ComposeHangul(jamo_indexes, jamo_romanizations)
+  """Unromanize a single hangul character.
+
+  Returns:
+    A hangul character, or None if romanized_character is not a romanized
+    hangul character.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  return scheme.UnromanizationTable().get(romanized_character)
 
 
 def RomanizeHangulString(unicode_string,
                          jamo_romanizations=JAMO_ROMANIZATIONS,
                          prefix='[', postfix=']'):
-  """Romanize a string with hangul characters."""
-  romanized_string = ''
-  for unicode_character in unicode_string:
-    romanized_character = RomanizeHangul(unicode_character, jamo_romanizations)
-    if romanized_character:
-      romanized_string += prefix + romanized_character + postfix
-    else:
-      romanized_string += unicode_character
-  return romanized_string
+  """Romanize a string with hangul characters.
+
+  jamo_romanizations may also be a RomanizationScheme. The per-scheme
+  translation table is built on first use and reused afterwards.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  return unicode_string.translate(scheme.TranslationTable(prefix, postfix))
 
 
 def UnromanizeHangulString(unicode_string,
                            jamo_romanizations=JAMO_ROMANIZATIONS,
                            prefix='[', postfix=']'):
-  """Unrromanize a string with romanized hangul characters."""
-  unromanized_hangul_string = ''
-  open_index = -1
-  commit_index = 0
-  for index, unicode_character in enumerate(unicode_string):
-    if unicode_character == prefix:
-      unromanized_hangul_string += unicode_string[commit_index:index]
-      commit_index = index
-      open_index = index
-    elif unicode_character == postfix:
-      unromanized_hangul_character = UnromanizeHangul(
-        unicode_string[open_index+1:index], jamo_romanizations)
-      if unromanized_hangul_character:
-        unromanized_hangul_string += unromanized_hangul_character
-        commit_index = index + 1
+  """Unrromanize a string with romanized hangul characters.
+
+  Spans which are not romanized hangul characters, and postfixes without a
+  matching prefix, are kept as they are.
+  """
+  if not prefix or not postfix:
+    return unicode_string
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  get_character = scheme.UnromanizationTable().get
+
+  def ReplaceSpan(match):
+    character = get_character(match.group(1))
+    if character is None:
+      if _instrumentation is not None:
+        _instrumentation.CountFailedUnromanization()
+      return match.group(0)
+    return character
+
+  return scheme.Scanner(prefix, postfix).sub(ReplaceSpan, unicode_string)
+
+
+class RomanizedHangulSegmenter(object):
+  """Unromanize text without prefixes and postfixes around each character.
+
+  Runs of characters used by the romanization are split into romanized hangul
+  characters by dynamic programming over the end positions. Each position
+  only looks at splits up to the longest possible romanization, so the time
+  is linear in the length of the text.
+
+  Among the splits covering the whole run, the one with the best sum of
+  per-character scores wins. Without frequencies every character scores the
+  same, which prefers fewer characters and then shorter characters first, so
+  a consonant between vowels starts the next character: gaga becomes 가가, not
+  각아. With frequencies the score is the log of the add-one smoothed
+  probability of each character, so hangugeo becomes 한국어 instead of 한구거
+  when 한, 국 and 어 are common.
+  """
+
+  def __init__(self, jamo_romanizations=JAMO_ROMANIZATIONS, frequencies=None):
+    """Prepare the tables.
+
+    Args:
+      frequencies: Optional mapping from hangul characters to counts.
+    """
+    self.scheme = CompileRomanizationScheme(jamo_romanizations)
+    self._unromanization_table = self.scheme.UnromanizationTable()
+    self._max_length = sum(max(len(jamo) for jamo in jamos)
+                           for jamos in self.scheme)
+    alphabet = ''.join(sorted(set(''.join(
+      itertools.chain.from_iterable(self.scheme)))))
+    if alphabet:
+      self._run_pattern = re.compile('[%s]+' % re.escape(alphabet))
+    else:
+      self._run_pattern = re.compile('(?!)')
+    total = self.scheme.num_characters
+    if frequencies:
+      total += sum(frequencies.values())
+      self._scores = dict((character, math.log((count + 1) / total))
+                          for character, count in frequencies.items())
+    else:
+      self._scores = {}
+    self._default_score = math.log(1 / total)
+
+  def Segment(self, romanized):
+    """Split romanized into romanized hangul characters.
+
+    Returns:
+      A list of (romanized character, hangul character) pairs covering the
+      whole string, or None if there is no such split.
+    """
+    get_character = self._unromanization_table.get
+    get_score = self._scores.get
+    default_score = self._default_score
+    length = len(romanized)
+    # best_scores[start] is the best score of romanized[start:], and
+    # best_ends[start] is where its first character ends.
+    best_scores = [None] * (length + 1)
+    best_scores[length] = 0.0
+    best_ends = [0] * (length + 1)
+    for start in range(length - 1, -1, -1):
+      best_score = None
+      for end in range(start + 1, min(length, start + self._max_length) + 1):
+        if best_scores[end] is None:
+          continue
+        character = get_character(romanized[start:end])
+        if character is None:
+          continue
+        score = best_scores[end] + get_score(character, default_score)
+        if best_score is None or score > best_score:
+          best_score = score
+          best_ends[start] = end
+      best_scores[start] = best_score
+    if best_scores[0] is None:
+      return None
+    pairs = []
+    start = 0
+    while start < length:
+      end = best_ends[start]
+      pairs.append((romanized[start:end],
+                    get_character(romanized[start:end])))
+      start = end
+    return pairs
+
+  def Unromanize(self, unicode_string):
+    """Unromanize every run which can be split; other text is kept."""
+
+    def ReplaceRun(match):
+      pairs = self.Segment(match.group())
+      if pairs is None:
+        return match.group()
+      return ''.join(character for _, character in pairs)
+
+    return self._run_pattern.sub(ReplaceRun, unicode_string)
+
+
+@functools.lru_cache(maxsize=None)
+def _GetSegmenter(scheme):
+  """Return the shared RomanizedHangulSegmenter without frequencies."""
+  return RomanizedHangulSegmenter(scheme)
+
+
+def UnromanizeUnbracketedHangulString(unicode_string,
+                                      jamo_romanizations=JAMO_ROMANIZATIONS,
+                                      frequencies=None):
+  """Unromanize a string like hangugeo which has no prefixes and postfixes.
+
+  Please see RomanizedHangulSegmenter. Build one directly to reuse the
+  frequency table across calls.
+  """
+  if frequencies:
+    segmenter = RomanizedHangulSegmenter(jamo_romanizations, frequencies)
+  else:
+    segmenter = _GetSegmenter(CompileRomanizationScheme(jamo_romanizations))
+  return segmenter.Unromanize(unicode_string)
+
+
+def _RomanizedOffsets(unicode_string, table, output_start=0):
+  """Yield output offsets of each character in unicode_string and the end."""
+  lengths = map(len, map(table.get, map(ord, unicode_string), unicode_string))
+  return itertools.accumulate(lengths, initial=output_start)
+
+
+def RomanizeHangulStringWithOffsets(unicode_string,
+                                    jamo_romanizations=JAMO_ROMANIZATIONS,
+                                    prefix='[', postfix=']'):
+  """RomanizeHangulString() which also returns where each character went.
+
+  Returns:
+    Tuple (romanized, offsets). offsets is an array of len(unicode_string) + 1
+    integers where romanized[offsets[i]:offsets[i + 1]] is the romanization
+    of unicode_string[i].
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  table = scheme.TranslationTable(prefix, postfix)
+  return (unicode_string.translate(table),
+          array.array('L', _RomanizedOffsets(unicode_string, table)))
+
+
+_OFFSET_BLOCK_SIZE = 4096
+
+
+class RomanizedText(object):
+  """Romanized text kept aligned with its source while the source is edited.
+
+  Romanization is done character by character, so an edit only romanizes the
+  replacement and the offset blocks it touches. Offsets are kept in blocks of
+  up to _OFFSET_BLOCK_SIZE characters relative to the start of each block, so
+  an edit shifts one start per block after it instead of every offset.
+  """
+
+  def __init__(self, unicode_string, jamo_romanizations=JAMO_ROMANIZATIONS,
+               prefix='[', postfix=']'):
+    scheme = CompileRomanizationScheme(jamo_romanizations)
+    self._table = scheme.TranslationTable(prefix, postfix)
+    self.source = unicode_string
+    self.romanized = unicode_string.translate(self._table)
+    self._source_starts, self._output_starts, self._blocks = self._Blocks(
+      unicode_string, 0, 0)
+
+  def _Blocks(self, unicode_string, source_start, output_start):
+    """Return (source starts, output starts, offset blocks) of a string."""
+    source_starts = array.array('L')
+    output_starts = array.array('L')
+    blocks = []
+    for block_start in range(0, len(unicode_string), _OFFSET_BLOCK_SIZE):
+      block = array.array('L', _RomanizedOffsets(
+        unicode_string[block_start:block_start + _OFFSET_BLOCK_SIZE],
+        self._table))
+      source_starts.append(source_start + block_start)
+      output_starts.append(output_start)
+      output_start += block.pop()
+      blocks.append(block)
+    return source_starts, output_starts, blocks
+
+  @property
+  def offsets(self):
+    """Array like the one of RomanizeHangulStringWithOffsets()."""
+    offsets = array.array('L')
+    for output_start, block in zip(self._output_starts, self._blocks):
+      offsets.extend(map(output_start.__add__, block))
+    offsets.append(len(self.romanized))
+    return offsets
+
+  def OutputOffset(self, source_offset):
+    """Return the offset in romanized where source_offset starts."""
+    if source_offset >= len(self.source):
+      return len(self.romanized)
+    block_index = bisect.bisect_right(self._source_starts, source_offset) - 1
+    return (self._output_starts[block_index] + self._blocks[block_index][
+      source_offset - self._source_starts[block_index]])
+
+  def SourceOffset(self, output_offset):
+    """Return the index of the source character covering output_offset.
+
+    The end of romanized maps to the end of the source.
+    """
+    if output_offset >= len(self.romanized):
+      return len(self.source)
+    block_index = max(
+      bisect.bisect_right(self._output_starts, output_offset) - 1, 0)
+    block = self._blocks[block_index]
+    local_offset = output_offset - self._output_starts[block_index]
+    return (self._source_starts[block_index] +
+            max(bisect.bisect_right(block, local_offset) - 1, 0))
+
+  def SourceSpan(self, output_start, output_end):
+    """Return the smallest source span covering romanized[start:end]."""
+    source_start = self.SourceOffset(output_start)
+    if output_end <= output_start:
+      return source_start, source_start
+    return source_start, self.SourceOffset(output_end - 1) + 1
+
+  def Edit(self, start, end, replacement):
+    """Replace source[start:end] with replacement.
+
+    Returns:
+      Tuple (output_start, output_end, romanized_replacement) which is the
+      same edit applied to romanized, for patching things aligned to it.
+    """
+    output_start = self.OutputOffset(start)
+    output_end = self.OutputOffset(end)
+    romanized_replacement = replacement.translate(self._table)
+    # Blocks from first_block up to last_block are rebuilt.
+    num_blocks = len(self._blocks)
+    first_block = max(bisect.bisect_right(self._source_starts, start) - 1, 0)
+    last_block = bisect.bisect_left(self._source_starts, end)
+    if first_block < last_block:
+      region_start = self._source_starts[first_block]
+      if last_block < num_blocks:
+        region_end = self._source_starts[last_block]
       else:
-        unromanized_hangul_string += unicode_string[commit_index:index]
-        commit_index = index
-      open_index = -1
-  unromanized_hangul_string += unicode_string[commit_index:]
-  return unromanized_hangul_string
+        region_end = len(self.source)
+    else:
+      first_block = last_block
+      region_start = region_end = start
+    region_output_start = self.OutputOffset(region_start)
+    source_delta = len(replacement) - (end - start)
+    output_delta = len(romanized_replacement) - (output_end - output_start)
+
+    source_starts, output_starts, blocks = self._Blocks(
+      self.source[region_start:start] + replacement +
+      self.source[end:region_end], region_start, region_output_start)
+    source_starts[:0] = self._source_starts[:first_block]
+    source_starts.extend(map(source_delta.__add__,
+                             self._source_starts[last_block:]))
+    output_starts[:0] = self._output_starts[:first_block]
+    output_starts.extend(map(output_delta.__add__,
+                             self._output_starts[last_block:]))
+    self._blocks[first_block:last_block] = blocks
+    self._source_starts = source_starts
+    self._output_starts = output_starts
+    self.source = self.source[:start] + replacement + self.source[end:]
+    self.romanized = (self.romanized[:output_start] + romanized_replacement +
+                      self.romanized[output_end:])
+    return output_start, output_end, romanized_replacement
+
+
+def _ReadChunks(stream, chunk_size):
+  """Yield text chunks from a file object or any iterable of strings."""
+  read = getattr(stream, 'read', None)
+  if read is not None:
+    return iter(lambda: read(chunk_size), '')
+  return iter(stream)
+
+
+def RomanizeHangulStream(stream,
+                         jamo_romanizations=JAMO_ROMANIZATIONS,
+                         prefix='[', postfix=']', chunk_size=65536):
+  """Romanize a text stream chunk by chunk.
+
+  Args:
+    stream: Text file object or an iterable of strings such as lines.
+    chunk_size: Number of characters read at a time from a file object.
+
+  Yields:
+    Romanized chunks. Joining them gives the same result as
+    RomanizeHangulString() on the whole text.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  table = scheme.TranslationTable(prefix, postfix)
+  for chunk in _ReadChunks(stream, chunk_size):
+    if chunk:
+      yield chunk.translate(table)
+
+
+def _PostfixMayStartPrefix(prefix, postfix):
+  """Return True if a prefix can start inside a postfix, as with | and |."""
+  return any(prefix.startswith(postfix[index:]) or
+             postfix[index:].startswith(prefix)
+             for index in range(len(postfix)))
+
+
+def _FindUnromanizeCut(text, scanner, prefix, postfix, max_span_length,
+                       release_long_spans):
+  """Return the index where text can be split without breaking a span.
+
+  The text before the cut is scanned the same way as in the whole text: it
+  ends after a span which is far enough from the end, and the earliest prefix
+  which may still start a span or a partial prefix at the end is held back.
+
+  Args:
+    release_long_spans: Do not hold back an open span longer than any
+        romanized character. It can never be unromanized, so this is safe
+        unless its postfix could also start a prefix.
+  """
+  guard = max(len(prefix), len(postfix))
+  position = 0
+  for match in scanner.finditer(text):
+    # Lookaheads near the end may change with more text.
+    if match.end() + guard > len(text):
+      return match.start()
+    position = match.end()
+  if release_long_spans:
+    position = max(position, len(text) - max_span_length + 1)
+  # A span starting at a prefix is still open if some text completes it: the
+  # rest of a postfix begun at the end, or any other character and a postfix.
+  filler = next(chr(code) for code in itertools.count()
+                if chr(code) not in prefix + postfix)
+  completions = [postfix[length:] for length in range(1, len(postfix))]
+  completions.append(filler + postfix)
+  open_index = text.find(prefix, position)
+  while open_index != -1:
+    if any(scanner.match(text[open_index:] + completion)
+           for completion in completions):
+      return open_index
+    open_index = text.find(prefix, open_index + 1)
+  # A prefix may be split across chunks if it is longer than a character.
+  for length in range(min(len(prefix) - 1, len(text) - position), 0, -1):
+    if text.endswith(prefix[:length]):
+      return len(text) - length
+  return len(text)
+
+
+def UnromanizeHangulStream(stream,
+                           jamo_romanizations=JAMO_ROMANIZATIONS,
+                           prefix='[', postfix=']', chunk_size=65536):
+  """Unromanize a text stream chunk by chunk.
+
+  A span split across chunks is held back until its postfix arrives. Spans
+  longer than any romanized character cannot be unromanized, so at most one
+  such span is held at a time unless the postfix can also start a prefix.
+
+  Args:
+    stream: Text file object or an iterable of strings such as lines.
+    chunk_size: Number of characters read at a time from a file object.
+
+  Yields:
+    Unromanized chunks. Joining them gives the same result as
+    UnromanizeHangulString() on the whole text.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  max_span_length = (len(prefix) + len(postfix) +
+                     max(len(romanized) for romanized in scheme.romanizations))
+  if prefix and postfix:
+    scanner = scheme.Scanner(prefix, postfix)
+    release_long_spans = not _PostfixMayStartPrefix(prefix, postfix)
+  pending = ''
+  for chunk in _ReadChunks(stream, chunk_size):
+    text = pending + chunk
+    if prefix and postfix:
+      cut = _FindUnromanizeCut(text, scanner, prefix, postfix,
+                               max_span_length, release_long_spans)
+    else:
+      cut = len(text)
+    if cut:
+      yield UnromanizeHangulString(text[:cut], scheme, prefix, postfix)
+    pending = text[cut:]
+  if pending:
+    yield UnromanizeHangulString(pending, scheme, prefix, postfix)
+
+
+def _AsciiPrefixLength(data):
+  """Return the number of leading ASCII bytes in a bytes-like object."""
+  try:
+    str(data, 'ascii')
+  except UnicodeDecodeError as error:
+    return error.start
+  return len(data)
+
+
+def _Utf8Length(lead_byte):
+  """Return the length of the UTF-8 sequence starting with lead_byte."""
+  if lead_byte < 0x80:
+    return 1
+  elif lead_byte < 0xe0:
+    return 2
+  elif lead_byte < 0xf0:
+    return 3
+  else:
+    return 4
+
+
+def _OrdUtf8Hangul(data, start, scheme):
+  """Return OrdHangul() of the 3 bytes at start, or -1 if it is not hangul.
+
+  Hangul characters are always 3 bytes long in UTF-8, so the code point is
+  computed from the bytes without decoding.
+  """
+  if start < 0 or len(data) - start < 3:
+    return -1
+  lead, second, third = data[start], data[start + 1], data[start + 2]
+  if lead & 0xf0 != 0xe0 or second & 0xc0 != 0x80 or third & 0xc0 != 0x80:
+    return -1
+  hangul_index = (((lead & 0x0f) << 12 | (second & 0x3f) << 6 | third & 0x3f) -
+                  ord(FIRST_HANGUL_CHARACTER))
+  if 0 <= hangul_index < scheme.num_characters:
+    return hangul_index
+  return -1
+
+
+def RomanizeHangulBytes(data,
+                        jamo_romanizations=JAMO_ROMANIZATIONS,
+                        prefix='[', postfix=']', out=None):
+  """Romanize a UTF-8 encoded bytes-like object.
+
+  The leading ASCII bytes are copied as they are, so payloads such as JSON
+  with hangul only in a few late fields are mostly never decoded. The rest is
+  decoded and translated in one pass with the C codec, which is faster than
+  converting hangul characters byte by byte in Python.
+
+  Args:
+    data: bytes, bytearray or memoryview in UTF-8.
+    out: bytearray to append the result to. A new one is used if None, so a
+      consumer can keep reusing a single buffer.
+
+  Returns:
+    out with the romanized UTF-8 bytes appended.
+  """
+  if out is None:
+    out = bytearray()
+  ascii_length = _AsciiPrefixLength(data)
+  out += data[:ascii_length]
+  if ascii_length < len(data):
+    scheme = CompileRomanizationScheme(jamo_romanizations)
+    text = str(data[ascii_length:], 'utf-8')
+    out += text.translate(scheme.TranslationTable(prefix, postfix)).encode(
+        'utf-8')
+  return out
+
+
+SEGMENT_SYLLABLES = 'syllables'
+SEGMENT_COMPATIBILITY_JAMOS = 'compatibility_jamos'
+SEGMENT_CONJOINING_JAMOS = 'conjoining_jamos'
+SEGMENT_OTHER = 'other'
+
+_SYLLABLE_RANGE = '\uac00-\ud7a3'
+_COMPATIBILITY_JAMO_RANGE = '\u3131-\u318e'
+_CONJOINING_JAMO_RANGE = '\u1100-\u11ff\ua960-\ua97f\ud7b0-\ud7ff'
+
+# Segment kinds in the order of the groups of _SEGMENT_PATTERN.
+_SEGMENT_KINDS = (None, SEGMENT_SYLLABLES, SEGMENT_COMPATIBILITY_JAMOS,
+                  SEGMENT_CONJOINING_JAMOS, SEGMENT_OTHER)
+_SEGMENT_PATTERN = re.compile('([%s]+)|([%s]+)|([%s]+)|([^%s%s%s]+)' % (
+  _SYLLABLE_RANGE, _COMPATIBILITY_JAMO_RANGE, _CONJOINING_JAMO_RANGE,
+  _SYLLABLE_RANGE, _COMPATIBILITY_JAMO_RANGE, _CONJOINING_JAMO_RANGE))
+
+_HANGUL_JAMOS_PATTERN = re.compile('[\u3131-\u3163]*')
+
+
+def SegmentHangul(unicode_string):
+  """Split a string into runs of the same script in one pass.
+
+  Yields:
+    Tuples (kind, start, end) covering the whole string, where kind is one of
+    SEGMENT_SYLLABLES (가), SEGMENT_COMPATIBILITY_JAMOS (ㄱ),
+    SEGMENT_CONJOINING_JAMOS (U+1100 block) and SEGMENT_OTHER.
+  """
+  for match in _SEGMENT_PATTERN.finditer(unicode_string):
+    yield _SEGMENT_KINDS[match.lastindex], match.start(), match.end()
 
 
 def IsHangulJamos(unicode_string):
   """Returns True if every characters are hangul jamos like ㄱ or ㅑ."""
-  for unicode_character in unicode_string:
-    if ord(unicode_character) not in range(ord('ㄱ'), ord('ㅣ') + 1):
-      return False
-  return True
+  return _HANGUL_JAMOS_PATTERN.fullmatch(unicode_string) is not None
+
+
+# First conjoining jamo of each family. Final index 0 stands for no final, so
+# final index 1 is FIRST_CONJOINING_FINAL.
+FIRST_CONJOINING_INITIAL = '\u1100'
+FIRST_CONJOINING_MEDIAL = '\u1161'
+FIRST_CONJOINING_FINAL = '\u11a8'
+
+# Splitting by the pattern puts syllable jamos at odd indexes.
+_CONJOINING_JAMOS_PATTERN = re.compile(
+  '([\u1100-\u1112][\u1161-\u1175][\u11a8-\u11c2]?|'
+  '[%s][\u11a8-\u11c2])' % _SYLLABLE_RANGE)
+
+
+def _ConjoiningJamos(jamo_indexes):
+  """Return the conjoining jamos of (initial, medial, final) indexes."""
+  initial, medial, final = jamo_indexes
+  jamos = (chr(ord(FIRST_CONJOINING_INITIAL) + initial) +
+           chr(ord(FIRST_CONJOINING_MEDIAL) + medial))
+  if final:
+    jamos += chr(ord(FIRST_CONJOINING_FINAL) + final - 1)
+  return jamos
+
+
+@functools.lru_cache(maxsize=None)
+def _ConjoiningJamoTables():
+  """Return (decomposition, composition) tables of conjoining jamos.
+
+  The decomposition table is for str.translate(). The composition table maps
+  both initial, medial and optional final jamos, and a syllable without a
+  final followed by a final jamo, to syllables.
+  """
+  decomposition = {}
+  composition = {}
+  for hangul_index in range(functools.reduce(operator.mul,
+                                             NUM_JAMOS)):
+    jamo_indexes = DecomposeHangulIndex(hangul_index, NUM_JAMOS)
+    character = ChrHangul(hangul_index)
+    jamos = _ConjoiningJamos(jamo_indexes)
+    decomposition[ord(character)] = jamos
+    composition[jamos] = character
+    if jamo_indexes[2]:
+      syllable = ChrHangul(hangul_index - jamo_indexes[2])
+      composition[syllable + jamos[-1]] = character
+  return decomposition, composition
+
+
+@functools.lru_cache(maxsize=None)
+def _CompatibilityJamoTable():
+  """Return a str.translate() table from syllables to compatibility jamos."""
+  table = {}
+  for hangul_index in range(functools.reduce(operator.mul,
+                                             NUM_JAMOS)):
+    initial, medial, final = DecomposeHangulIndex(hangul_index,
+                                                  NUM_JAMOS)
+    table[ord(ChrHangul(hangul_index))] = (
+      INITIAL_JAMOS[initial] + MEDIAL_JAMOS[medial] + FINAL_JAMOS[final])
+  return table
+
+
+def SyllablesToConjoiningJamos(unicode_string):
+  """Decompose hangul syllables to conjoining jamos, like NFD.
+
+  간 becomes U+1100 U+1161 U+11AB. Other characters are kept as they are.
+  """
+  return unicode_string.translate(_ConjoiningJamoTables()[0])
+
+
+def ConjoiningJamosToSyllables(unicode_string):
+  """Compose conjoining jamos to hangul syllables, like NFC.
+
+  A syllable without a final followed by a final jamo is composed as well.
+  Jamos which do not make a modern syllable are kept as they are.
+  """
+  pieces = _CONJOINING_JAMOS_PATTERN.split(unicode_string)
+  syllables = pieces[1::2]
+  # A syllable which already has a final is kept with the final jamo.
+  pieces[1::2] = map(_ConjoiningJamoTables()[1].get, syllables, syllables)
+  return ''.join(pieces)
+
+
+def SyllablesToCompatibilityJamos(unicode_string):
+  """Decompose hangul syllables to compatibility jamos.
+
+  간 becomes ㄱㅏㄴ, and compound jamos stay single characters as in 값,
+  which becomes ㄱㅏㅄ. Other characters are kept as they are.
+  """
+  return unicode_string.translate(_CompatibilityJamoTable())
 
 
 def HasFinalConsonants(unicode_string, jamo_romanizations=JAMO_ROMANIZATIONS):
+  """Returns True if the last character has a final consonant.
+
+  Returns None if the string is empty or does not end with hangul.
+  """
   if unicode_string:
-    jamo_index = DecomposeHangul(unicode_string[-1], jamo_romanizations)
-    if jamo_index:
-      return jamo_index[2] > 0
+    scheme = CompileRomanizationScheme(jamo_romanizations)
+    hangul_index = OrdHangul(unicode_string[-1])
+    if 0 <= hangul_index < scheme.num_characters:
+      return scheme.HasFinalConsonant(hangul_index)
+
+
+def HasFinalConsonantsBytes(data, jamo_romanizations=JAMO_ROMANIZATIONS):
+  """HasFinalConsonants() for a UTF-8 encoded bytes-like object.
+
+  Only the last 3 bytes are looked at and nothing is decoded.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  hangul_index = _OrdUtf8Hangul(data, len(data) - 3, scheme)
+  if hangul_index >= 0:
+    return scheme.HasFinalConsonant(hangul_index)
 
 
 def AppendHangulPostfix(string, no_cons, cons):
@@ -211,6 +1244,115 @@ def AppendHangulPostfix(string, no_cons, cons):
     return string + no_cons
 
 
+# Josa with and without final consonants in the preceding word.
+_JOSA_PAIRS = (
+  ('은', '는'), ('이', '가'), ('을', '를'), ('과', '와'), ('으로', '로'),
+  ('이다', '다'), ('아', '야'), ('이나', '나'), ('이랑', '랑'), ('이며', '며'),
+  ('이여', '여'), ('으로서', '로서'), ('으로써', '로써'))
+
+# Only 으 or 이 in parentheses followed by a josa is optional, so that text
+# like (주) is kept.
+_JOSA_PATTERN = re.compile(
+  r'\((?P<first>[\uac00-\ud7a3]+)/(?P<second>[\uac00-\ud7a3]+)\)|'
+  r'\((?P<optional>[으이])\)(?P<rest>%s)' % '|'.join(sorted(
+    (no_cons for cons, no_cons in _JOSA_PAIRS
+     if cons in ('으' + no_cons, '이' + no_cons)), key=len, reverse=True)))
+
+
+class JosaTemplate(object):
+  """A str.format() template which picks josa after each field.
+
+  A field can be followed by a josa pair like {name}(은/는) or {name}(와/과),
+  in either order, or by an optional 으 or 이 like {name}(으)로. The pair is
+  replaced by the josa which fits the last character of the field value.
+  As in Korean, 으로 becomes 로 after a final ㄹ. Other parentheses such as
+  (주) or (개/명) are kept as they are.
+
+    template = hangul.JosaTemplate('{name}(은/는) {item}(을/를) 샀습니다')
+    template.Format(name='철수', item='책')  # '철수는 책을 샀습니다'
+  """
+
+  def __init__(self, template, jamo_romanizations=JAMO_ROMANIZATIONS):
+    self.template = template
+    self._scheme = CompileRomanizationScheme(jamo_romanizations)
+    self._formatter = string.Formatter()
+    # Parts are (literal, field_name, conversion, format_spec, josa) where
+    # josa is (cons, no_cons, rieul_takes_no_cons) or None.
+    self._parts = []
+    # Next index for empty field names like {}, or None for manual numbering.
+    self._next_index = 0
+    for literal, field_name, format_spec, conversion in (
+        self._formatter.parse(template)):
+      if self._parts and self._parts[-1][1] is not None:
+        literal = self._ParseJosa(literal, self._parts[-1])
+      if field_name is not None:
+        field_name = self._NumberField(field_name)
+      self._parts.append([literal, field_name, conversion, format_spec, None])
+
+  def _NumberField(self, field_name):
+    """Number an empty field name as str.format() does."""
+    first = re.match(r'[^.[]*', field_name).group()
+    if first:
+      if first.isdigit():
+        if self._next_index:
+          raise ValueError('cannot switch from automatic field numbering to '
+                           'manual field specification')
+        self._next_index = None
+      return field_name
+    if self._next_index is None:
+      raise ValueError('cannot switch from manual field specification to '
+                       'automatic field numbering')
+    self._next_index += 1
+    return str(self._next_index - 1) + field_name
+
+  def _ParseJosa(self, literal, part):
+    """Store the josa at the start of literal into part."""
+    match = _JOSA_PATTERN.match(literal)
+    if not match:
+      return literal
+    if match.group('optional'):
+      cons = match.group('optional') + match.group('rest')
+      no_cons = match.group('rest')
+      if (cons, no_cons) not in _JOSA_PAIRS:
+        return literal
+    else:
+      cons, no_cons = match.group('first'), match.group('second')
+      if (no_cons, cons) in _JOSA_PAIRS:
+        cons, no_cons = no_cons, cons
+      elif (cons, no_cons) not in _JOSA_PAIRS:
+        # Other pairs like (개/명) are ordinary text.
+        return literal
+    part[4] = (cons, no_cons, cons == '으' + no_cons)
+    return literal[match.end():]
+
+  def SelectJosa(self, string, cons, no_cons, rieul_takes_no_cons=False):
+    """Return the josa which fits the last character of string."""
+    scheme = self._scheme
+    hangul_index = OrdHangul(string[-1]) if string else -1
+    if (hangul_index < 0 or hangul_index >= scheme.num_characters or
+        not scheme.HasFinalConsonant(hangul_index)):
+      return no_cons
+    if (rieul_takes_no_cons and
+        hangul_index % scheme.num_jamos[-1] == FINAL_JAMOS.index('ㄹ')):
+      return no_cons
+    return cons
+
+  def Format(self, *args, **kwargs):
+    """Format the template like str.format() with josa fitted to fields."""
+    formatter = self._formatter
+    pieces = []
+    for literal, field_name, conversion, format_spec, josa in self._parts:
+      pieces.append(literal)
+      if field_name is not None:
+        value, _ = formatter.get_field(field_name, args, kwargs)
+        value = formatter.format_field(
+          formatter.convert_field(value, conversion), format_spec)
+        pieces.append(value)
+        if josa is not None:
+          pieces.append(self.SelectJosa(value, *josa))
+    return ''.join(pieces)
+
+
 def GetInitialCharacter(unicode_string,
                         jamo_romanizations=JAMO_ROMANIZATIONS,
                         initial_jamos=INITIAL_JAMOS):
@@ -227,3 +1369,248 @@ def GetInitialCharacter(unicode_string,
       return first_character.upper()
   else:
     return None
+
+
+def GetInitialCharacters(unicode_string,
+                         jamo_romanizations=JAMO_ROMANIZATIONS,
+                         initial_jamos=INITIAL_JAMOS):
+  """Get initial characters of every character in the string.
+
+  This is GetInitialCharacter() applied to each character, so 이순신 becomes
+  ㅇㅅㅅ and Michael becomes MICHAEL.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  return unicode_string.translate(scheme.InitialTable(initial_jamos)).upper()
+
+
+def GetInitialCharacterBytes(data,
+                             jamo_romanizations=JAMO_ROMANIZATIONS,
+                             initial_jamos=INITIAL_JAMOS,
+                             coding='utf-8'):
+  """GetInitialCharacter() for an encoded bytes-like object.
+
+  As in the python 2 module, a str is accepted as well and the result is
+  encoded in coding. For UTF-8 only the first character is looked at, and
+  hangul is handled without decoding.
+
+  Returns:
+    The initial character encoded in coding, or None if data is empty.
+  """
+  if isinstance(data, str) or codecs.lookup(coding).name != 'utf-8':
+    if not isinstance(data, str):
+      data = str(data, coding)
+    initial = GetInitialCharacter(data, jamo_romanizations, initial_jamos)
+    return None if initial is None else initial.encode(coding)
+  if not data:
+    return None
+  lead_byte = data[0]
+  if lead_byte < 0x80:
+    return bytes((lead_byte,)).upper()
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  hangul_index = _OrdUtf8Hangul(data, 0, scheme)
+  if hangul_index >= 0:
+    num_characters_per_initial = scheme.num_characters // scheme.num_jamos[0]
+    initial = initial_jamos[hangul_index // num_characters_per_initial]
+    return initial.encode('utf-8')
+  first_character = str(data[:_Utf8Length(lead_byte)], 'utf-8')
+  return first_character.upper().encode('utf-8')
+
+
+def HangulSortKey(unicode_string,
+                  jamo_romanizations=JAMO_ROMANIZATIONS,
+                  initial_jamos=INITIAL_JAMOS):
+  """Return a bytes key which sorts strings in Korean dictionary order.
+
+  Characters are compared by whitespace first, then hangul in jamo order,
+  Latin letters ignoring case, digits, and everything else by code point.
+  A lone initial jamo like ㄱ sorts right before 가, and a lone medial jamo
+  like ㅏ right before 아. Ties are broken by code points, so different
+  strings never get the same key. Keys compare as plain bytes, so they can
+  be used for an external sort.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  table = scheme.SortKeyTable(initial_jamos)
+  return (unicode_string.translate(table).encode('latin-1') + b'\0' +
+          unicode_string.encode('utf-32-be', 'surrogatepass'))
+
+
+def GroupByInitialCharacter(strings,
+                            jamo_romanizations=JAMO_ROMANIZATIONS,
+                            initial_jamos=INITIAL_JAMOS):
+  """Group strings by GetInitialCharacter() in one pass.
+
+  Returns:
+    Dict from initial characters to lists of strings in their original order.
+    Keys are in the order they are first seen, and empty strings are grouped
+    under None.
+  """
+  scheme = CompileRomanizationScheme(jamo_romanizations)
+  get_initial = scheme.InitialTable(initial_jamos).get
+  groups = {}
+  for string in strings:
+    if string:
+      first_character = string[0]
+      initial = get_initial(ord(first_character)) or first_character.upper()
+    else:
+      initial = None
+    group = groups.get(initial)
+    if group is None:
+      groups[initial] = group = []
+    group.append(string)
+  return groups
+
+
+INSTRUMENTED_FUNCTIONS = (
+  'RomanizeHangul', 'UnromanizeHangul', 'RomanizeHangulString',
+  'UnromanizeHangulString', 'IsHangulJamos', 'HasFinalConsonants',
+  'AppendHangulPostfix', 'GetInitialCharacter', 'GetInitialCharacters')
+
+_NON_SYLLABLE_PATTERN = re.compile('[^%s]+' % _SYLLABLE_RANGE)
+
+
+class Instrumentation(object):
+  """Counters of instrumented function calls.
+
+  Only the outermost instrumented call is recorded, so a function calling
+  another instrumented function is not counted twice. Attributes are
+  collections.Counter keyed by function name:
+    calls: Number of calls.
+    characters: Number of characters in the first argument.
+    hangul_characters: Number of hangul syllables in the first argument.
+    failed_unromanizations: Number of spans or characters which could not be
+        unromanized, that is None returned from UnromanizeHangul().
+    seconds: Cumulative time spent in the function.
+  """
+
+  def __init__(self, hook=None):
+    """Create counters.
+
+    Args:
+      hook: Optional function called after every instrumented call with
+          (name, characters, hangul_characters, failed_unromanizations,
+          seconds), for exporting to a metrics system.
+    """
+    self.hook = hook
+    # Failed unromanizations so far in the outermost call, or None outside
+    # instrumented calls. Each thread has its own.
+    self._local = threading.local()
+    self.Reset()
+
+  def Reset(self):
+    self.calls = collections.Counter()
+    self.characters = collections.Counter()
+    self.hangul_characters = collections.Counter()
+    self.failed_unromanizations = collections.Counter()
+    self.seconds = collections.Counter()
+
+  def Record(self, name, characters, hangul_characters, failed_unromanizations,
+             seconds):
+    self.calls[name] += 1
+    self.characters[name] += characters
+    self.hangul_characters[name] += hangul_characters
+    if failed_unromanizations:
+      self.failed_unromanizations[name] += failed_unromanizations
+    self.seconds[name] += seconds
+    if self.hook is not None:
+      self.hook(name, characters, hangul_characters, failed_unromanizations,
+                seconds)
+
+  def CountFailedUnromanization(self):
+    """Count a span which could not be unromanized in the current call."""
+    if getattr(self._local, 'failed_unromanizations', None) is not None:
+      self._local.failed_unromanizations += 1
+
+  def HangulRatio(self, name):
+    """Return the ratio of hangul syllables in the input of a function."""
+    if not self.characters[name]:
+      return 0.0
+    return self.hangul_characters[name] / self.characters[name]
+
+  def Snapshot(self):
+    """Return the counters as a dict from function names to dicts."""
+    return dict(
+      (name, {'calls': self.calls[name],
+              'characters': self.characters[name],
+              'hangul_characters': self.hangul_characters[name],
+              'failed_unromanizations': self.failed_unromanizations[name],
+              'seconds': self.seconds[name]})
+      for name in self.calls)
+
+
+def _Instrument(name, function, instrumentation):
+  # Name of the first parameter, which is the text to count.
+  text_parameter = function.__code__.co_varnames[0]
+
+  @functools.wraps(function)
+  def InstrumentedFunction(*args, **kwargs):
+    local = instrumentation._local
+    if getattr(local, 'failed_unromanizations', None) is not None:
+      return function(*args, **kwargs)
+    local.failed_unromanizations = 0
+    start = time.perf_counter()
+    try:
+      result = function(*args, **kwargs)
+    finally:
+      failed_unromanizations = local.failed_unromanizations
+      local.failed_unromanizations = None
+    seconds = time.perf_counter() - start
+    if name == 'UnromanizeHangul' and result is None:
+      failed_unromanizations += 1
+    text = args[0] if args else kwargs.get(text_parameter)
+    if not isinstance(text, str):
+      text = ''
+    non_syllables = sum(len(match)
+                        for match in _NON_SYLLABLE_PATTERN.findall(text))
+    instrumentation.Record(name, len(text), len(text) - non_syllables,
+                           failed_unromanizations, seconds)
+    return result
+
+  InstrumentedFunction.uninstrumented = function
+  return InstrumentedFunction
+
+
+_instrumentation = None
+
+
+def EnableInstrumentation(hook=None):
+  """Start counting calls of INSTRUMENTED_FUNCTIONS.
+
+  The module functions are replaced with counting wrappers, and restored by
+  DisableInstrumentation(), so there is no cost while disabled. Functions
+  imported with "from hangul import ..." before enabling are not counted.
+
+  Args:
+    hook: See Instrumentation().
+
+  Returns:
+    The Instrumentation holding the counters.
+  """
+  global _instrumentation
+  DisableInstrumentation()
+  _instrumentation = Instrumentation(hook)
+  module_globals = globals()
+  for name in INSTRUMENTED_FUNCTIONS:
+    module_globals[name] = _Instrument(name, module_globals[name],
+                                       _instrumentation)
+  return _instrumentation
+
+
+def DisableInstrumentation():
+  """Stop counting and restore the module functions."""
+  global _instrumentation
+  if _instrumentation is None:
+    return
+  module_globals = globals()
+  for name in INSTRUMENTED_FUNCTIONS:
+    module_globals[name] = module_globals[name].uninstrumented
+  _instrumentation = None
+
+
+def GetInstrumentation():
+  """Return the current Instrumentation, or None if disabled."""
+  return _instrumentation
+
+
+if __name__ == '__main__':
+  import hangul_cli
+  sys.exit(hangul_cli.main())
@@ -0,0 +1,260 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Apache Arrow string column versions of the hangul string functions.
+
+The functions take a pyarrow StringArray, LargeStringArray, ChunkedArray or a
+pandas Series of strings. They work on the offsets and UTF-8 data buffers
+with numpy, so no Python string is made per row, and return new Arrow arrays.
+A pandas Series gives back a Series with the same index.
+
+This module requires numpy and pyarrow. pandas is optional.
+"""
+
+import numpy
+import pyarrow
+
+import hangul
+
+try:
+  import pandas
+except ImportError:
+  pandas = None
+
+# Index of the first hangul entry in a byte string table. Entries below are
+# the single bytes 0 to 255.
+_HANGUL_ENTRY = 256
+
+_MAX_STRING_OFFSET = 2 ** 31 - 1
+
+
+class _ByteStringTable(object):
+  """Concatenated byte strings which can be gathered by entry indexes."""
+
+  def __init__(self, byte_strings):
+    self.lengths = numpy.fromiter((len(byte_string)
+                                   for byte_string in byte_strings),
+                                  dtype=numpy.int64, count=len(byte_strings))
+    self.starts = numpy.zeros(len(byte_strings), dtype=numpy.int64)
+    numpy.cumsum(self.lengths[:-1], out=self.starts[1:])
+    self.data = numpy.frombuffer(b''.join(byte_strings) or b'\0',
+                                 dtype=numpy.uint8)
+
+  def Gather(self, entries):
+    """Return (bytes of the entries joined, cumulative output lengths)."""
+    lengths = self.lengths[entries]
+    ends = numpy.cumsum(lengths)
+    total = int(ends[-1]) if len(ends) else 0
+    # Each output byte is at start of its entry plus its position in it.
+    entry_starts = numpy.repeat(self.starts[entries] - (ends - lengths),
+                                lengths)
+    positions = entry_starts + numpy.arange(total, dtype=numpy.int64)
+    return self.data[positions], ends
+
+
+_romanization_tables = {}
+_initial_tables = {}
+
+
+def _RomanizationTable(scheme, prefix, postfix):
+  """Return a _ByteStringTable of bytes followed by romanized characters."""
+  key = (scheme, prefix, postfix)
+  table = _romanization_tables.get(key)
+  if table is None:
+    byte_strings = [bytes((byte,)) for byte in range(_HANGUL_ENTRY)]
+    for hangul_index, romanized in enumerate(scheme.romanizations):
+      if romanized:
+        romanized = prefix + romanized + postfix
+      else:
+        romanized = hangul.ChrHangul(hangul_index)
+      byte_strings.append(romanized.encode('utf-8'))
+    table = _romanization_tables[key] = _ByteStringTable(byte_strings)
+  return table
+
+
+def _InitialTable(scheme, initial_jamos):
+  """Return initial byte strings of upper ASCII bytes and hangul."""
+  key = (scheme, tuple(initial_jamos))
+  table = _initial_tables.get(key)
+  if table is None:
+    byte_strings = [bytes((byte,)).upper() for byte in range(_HANGUL_ENTRY)]
+    num_per_initial = scheme.num_characters // scheme.num_jamos[0]
+    byte_strings.extend(
+      initial_jamos[hangul_index // num_per_initial].encode('utf-8')
+      for hangul_index in range(scheme.num_characters))
+    table = _initial_tables[key] = byte_strings
+  return table
+
+
+def _DecodeHangul(data, scheme):
+  """Return hangul indexes of 3-byte sequences starting at each byte.
+
+  data must be followed by 2 padding bytes. The index is -1 where no hangul
+  character starts.
+  """
+  lead = data[:-2].astype(numpy.int64)
+  second = data[1:-1].astype(numpy.int64)
+  third = data[2:].astype(numpy.int64)
+  code_points = (lead & 0x0f) << 12 | (second & 0x3f) << 6 | third & 0x3f
+  hangul_indexes = code_points - ord(hangul.FIRST_HANGUL_CHARACTER)
+  is_hangul = ((lead & 0xf0 == 0xe0) & (second & 0xc0 == 0x80) &
+               (third & 0xc0 == 0x80) & (hangul_indexes >= 0) &
+               (hangul_indexes < scheme.num_characters))
+  return numpy.where(is_hangul, hangul_indexes, -1)
+
+
+def _Buffers(array):
+  """Return (offsets, padded data) of a string array as numpy arrays.
+
+  The offsets are rebased to start from 0 and the data has 2 extra zero bytes
+  at the end.
+  """
+  offset_type = numpy.int64 if pyarrow.types.is_large_string(
+    array.type) else numpy.int32
+  _, offsets_buffer, data_buffer = array.buffers()
+  offsets = numpy.frombuffer(offsets_buffer, dtype=offset_type,
+                             count=len(array) + 1, offset=array.offset *
+                             numpy.dtype(offset_type).itemsize)
+  offsets = offsets.astype(numpy.int64)
+  begin, end = offsets[0], offsets[-1]
+  data = numpy.zeros(end - begin + 2, dtype=numpy.uint8)
+  if data_buffer is not None and end > begin:
+    data[:-2] = numpy.frombuffer(data_buffer, dtype=numpy.uint8,
+                                 count=end - begin, offset=begin)
+  return offsets - begin, data
+
+
+def _IsNull(array, is_null=None):
+  """Return a numpy mask of null rows, optionally adding is_null."""
+  if is_null is None:
+    is_null = numpy.zeros(len(array), dtype=bool)
+  if array.null_count:
+    is_null = is_null | array.is_null().to_numpy(zero_copy_only=False)
+  return is_null
+
+
+def _StringArray(array, offsets, data, is_null=None):
+  """Return a string array like array with new offsets and data.
+
+  Rows which are null in array or set in the optional is_null mask are null.
+  A StringArray whose data does not fit in 32-bit offsets becomes a
+  LargeStringArray.
+  """
+  large = (pyarrow.types.is_large_string(array.type) or
+           offsets[-1] > _MAX_STRING_OFFSET)
+  if large:
+    array_type, offset_type = pyarrow.large_string(), numpy.int64
+  else:
+    array_type, offset_type = pyarrow.string(), numpy.int32
+  is_null = _IsNull(array, is_null)
+  validity = None
+  if is_null.any():
+    validity = pyarrow.py_buffer(numpy.packbits(~is_null, bitorder='little'))
+  return pyarrow.Array.from_buffers(
+    array_type, len(array),
+    [validity, pyarrow.py_buffer(offsets.astype(offset_type)),
+     pyarrow.py_buffer(data)], int(is_null.sum()))
+
+
+def _Apply(function, values, *args):
+  """Apply function to each string array in values and wrap the result."""
+  if pandas is not None and isinstance(values, pandas.Series):
+    result = _Apply(function, pyarrow.Array.from_pandas(values), *args)
+    return pandas.Series(result, index=values.index, name=values.name,
+                         dtype=pandas.ArrowDtype(result.type))
+  if isinstance(values, pyarrow.ChunkedArray):
+    chunks = [function(chunk, *args) for chunk in values.chunks]
+    if chunks:
+      return pyarrow.chunked_array(chunks)
+    return pyarrow.chunked_array([], function(
+      pyarrow.array([], values.type), *args).type)
+  if not (pyarrow.types.is_string(values.type) or
+          pyarrow.types.is_large_string(values.type)):
+    raise TypeError('Expected a string array, got %s' % values.type)
+  return function(values, *args)
+
+
+def _RomanizeArray(array, scheme, prefix, postfix):
+  offsets, data = _Buffers(array)
+  hangul_indexes = _DecodeHangul(data, scheme)
+  is_hangul = hangul_indexes >= 0
+  # Continuation bytes of hangul characters produce no output.
+  keep = numpy.ones(len(hangul_indexes), dtype=bool)
+  keep[1:] &= ~is_hangul[:-1]
+  keep[2:] &= ~is_hangul[:-2]
+  entries = numpy.where(is_hangul, _HANGUL_ENTRY + hangul_indexes,
+                        data[:-2])[keep]
+  out_data, ends = _RomanizationTable(scheme, prefix, postfix).Gather(entries)
+  # Output offset of a row is the output length of the entries before it.
+  num_entries_before = numpy.zeros(len(keep) + 1, dtype=numpy.int64)
+  numpy.cumsum(keep, out=num_entries_before[1:])
+  out_ends = numpy.concatenate(([0], ends))
+  return _StringArray(array, out_ends[num_entries_before[offsets]], out_data)
+
+
+def RomanizeHangulArray(values,
+                        jamo_romanizations=hangul.JAMO_ROMANIZATIONS,
+                        prefix='[', postfix=']'):
+  """Batch version of hangul.RomanizeHangulString() for string columns."""
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  return _Apply(_RomanizeArray, values, scheme, prefix, postfix)
+
+
+def _GetInitialCharacterArray(array, scheme, initial_jamos):
+  offsets, data = _Buffers(array)
+  byte_strings = list(_InitialTable(scheme, initial_jamos))
+  starts = offsets[:-1]
+  is_empty = offsets[1:] == starts
+  lead = data[starts].astype(numpy.int64)
+  hangul_indexes = numpy.append(_DecodeHangul(data, scheme), -1)[starts]
+  entries = numpy.where(hangul_indexes >= 0, _HANGUL_ENTRY + hangul_indexes,
+                        lead)
+  # Rows starting with other non-ASCII characters decode only that character.
+  for row in numpy.flatnonzero((lead >= 0x80) & (hangul_indexes < 0) &
+                               ~is_empty):
+    start = starts[row]
+    first_character = hangul.GetInitialCharacterBytes(
+      data[start:start + 4].tobytes())
+    entries[row] = len(byte_strings)
+    byte_strings.append(first_character)
+  # GetInitialCharacter() returns None for empty strings.
+  entries[is_empty] = len(byte_strings)
+  byte_strings.append(b'')
+  out_data, ends = _ByteStringTable(byte_strings).Gather(entries)
+  return _StringArray(array, numpy.concatenate(([0], ends)), out_data,
+                      is_empty)
+
+
+def GetInitialCharacterArray(values,
+                             jamo_romanizations=hangul.JAMO_ROMANIZATIONS,
+                             initial_jamos=hangul.INITIAL_JAMOS):
+  """Batch version of hangul.GetInitialCharacter() for string columns.
+
+  Empty strings and nulls give nulls.
+  """
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  return _Apply(_GetInitialCharacterArray, values, scheme, initial_jamos)
+
+
+def _HasFinalConsonantsArray(array, scheme):
+  offsets, data = _Buffers(array)
+  ends = offsets[1:]
+  hangul_indexes = numpy.append(_DecodeHangul(data, scheme), -1)[
+    numpy.maximum(ends - 3, 0)]
+  is_hangul = (hangul_indexes >= 0) & (ends - offsets[:-1] >= 3)
+  final_consonant_bits = numpy.unpackbits(
+    numpy.frombuffer(scheme.final_consonant_bits, dtype=numpy.uint8),
+    bitorder='little')
+  flags = final_consonant_bits[numpy.maximum(hangul_indexes, 0)].astype(bool)
+  return pyarrow.array(flags, mask=_IsNull(array, ~is_hangul))
+
+
+def HasFinalConsonantsArray(values,
+                            jamo_romanizations=hangul.JAMO_ROMANIZATIONS):
+  """Batch version of hangul.HasFinalConsonants() for string columns.
+
+  Rows which do not end with hangul give nulls.
+  """
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  return _Apply(_HasFinalConsonantsArray, values, scheme)
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import unittest
+import hangul
+
+try:
+  import pyarrow
+  import hangul_arrow
+except ImportError:
+  pyarrow = None
+
+try:
+  import pandas
+except ImportError:
+  pandas = None
+
+STRINGS = ['가나 a', None, '', 'é가', '없', 'x\U0001f600', '한국어', 'Michael']
+
+
+@unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+class TestHangulArrow(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testRomanizeHangulArray(self):
+    self.assertEqual(
+      ['[ga][na] a', None, '', 'é[ga]', '[eobs]', 'x\U0001f600',
+       '[han][gug][eo]', 'Michael'],
+      hangul_arrow.RomanizeHangulArray(pyarrow.array(STRINGS)).to_pylist())
+    self.assertEqual(
+      ['(eobs)', 'x\U0001f600'],
+      hangul_arrow.RomanizeHangulArray(
+        pyarrow.array(STRINGS, pyarrow.large_string()).slice(4, 2),
+        prefix='(', postfix=')').to_pylist())
+    self.assertEqual(
+      [], hangul_arrow.RomanizeHangulArray(pyarrow.array([], 'string'))
+      .to_pylist())
+    with self.assertRaises(TypeError):
+      hangul_arrow.RomanizeHangulArray(pyarrow.array([1]))
+
+    # Hangul characters romanized to an empty string are kept.
+    jamo = (('', 'g'), ('',), ('',))
+    self.assertEqual(['가[g]'], hangul_arrow.RomanizeHangulArray(
+      pyarrow.array(['가각']), jamo).to_pylist())
+
+  def testGetInitialCharacterArray(self):
+    self.assertEqual(
+      ['ㄱ', None, None, 'É', 'ㅇ', 'X', 'ㅎ', 'M'],
+      hangul_arrow.GetInitialCharacterArray(pyarrow.array(STRINGS))
+      .to_pylist())
+    strings = [string for string in STRINGS if string is not None]
+    self.assertEqual(
+      [hangul.GetInitialCharacter(string) for string in strings],
+      hangul_arrow.GetInitialCharacterArray(
+        pyarrow.chunked_array([strings[:3], strings[3:]])).to_pylist())
+
+  def testHasFinalConsonantsArray(self):
+    self.assertEqual(
+      [None, None, None, False, True, None, False, None],
+      hangul_arrow.HasFinalConsonantsArray(pyarrow.array(STRINGS))
+      .to_pylist())
+    characters = [hangul.ChrHangul(hangul_index)
+                  for hangul_index in range(0, 11172, 13)]
+    self.assertEqual(
+      [hangul.HasFinalConsonants(character) for character in characters],
+      hangul_arrow.HasFinalConsonantsArray(pyarrow.array(characters))
+      .to_pylist())
+
+  @unittest.skipIf(pandas is None, 'pandas is not installed')
+  def testSeries(self):
+    series = pandas.Series(['이순신', 'nelly'], index=[3, 5], name='name')
+    initials = hangul_arrow.GetInitialCharacterArray(series)
+    self.assertEqual(['ㅇ', 'N'], initials.tolist())
+    self.assertEqual([3, 5], initials.index.tolist())
+    self.assertEqual('name', initials.name)
+
+
+if __name__ == '__main__':
+  unittest.main()
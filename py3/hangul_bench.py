@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Benchmarks for the hangul module with regression checks.
+
+Corpora are generated from a fixed seed so that runs are comparable:
+
+  python3 hangul_bench.py --sizes 1KB,1MB --save-baseline baseline.json
+  python3 hangul_bench.py --sizes 1KB,1MB --baseline baseline.json
+
+The second command exits with status 1 if any benchmark got slower or used
+more memory than the baseline by more than --threshold.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+import hangul
+import hangul_search
+
+CORPUS_KINDS = ('hangul', 'mixed', 'jamo', 'romanized')
+
+# Corpora larger than this repeat a block of this size.
+_BLOCK_SIZE = 1 << 20
+
+_SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+_ASCII_WORDS = ('the', 'log', 'user', 'id', 'GET', '/api/v1', '200', 'OK',
+                '2PM', 'error:', 'x', '3.14', '#tag', 'http://example.com')
+
+
+def ParseSize(size):
+  """Parse a size like 1KB, 16MB or 1GB to a number of bytes."""
+  match = re.match(r'^\s*(\d+)\s*([KMG]?)B?\s*$', size.upper())
+  if not match:
+    raise ValueError('Invalid size: %r' % size)
+  return int(match.group(1)) * _SIZE_UNITS[match.group(2)]
+
+
+def _RandomSyllables(rng, length):
+  return ''.join(hangul.ChrHangul(rng.randrange(11172))
+                 for _ in range(length))
+
+
+def _GenerateBlock(kind, size, seed):
+  """Generate about size bytes of UTF-8 text of the given kind."""
+  if kind == 'romanized':
+    # Romanized syllables take about twice as many bytes.
+    return hangul.RomanizeHangulString(_GenerateBlock('hangul', size // 2,
+                                                      seed))
+  rng = random.Random('%s-%d' % (kind, seed))
+  words = []
+  num_bytes = 0
+  while num_bytes < size:
+    if kind == 'hangul':
+      word = _RandomSyllables(rng, rng.randint(1, 4))
+    elif kind == 'mixed':
+      if rng.random() < 0.5:
+        word = _RandomSyllables(rng, rng.randint(1, 4))
+      else:
+        word = rng.choice(_ASCII_WORDS)
+    else:
+      if rng.random() < 0.7:
+        word = rng.choice(hangul.INITIAL_JAMOS + hangul.MEDIAL_JAMOS) * (
+          rng.randint(1, 5))
+      else:
+        word = _RandomSyllables(rng, rng.randint(1, 3))
+    word += '\n' if rng.random() < 0.1 else ' '
+    words.append(word)
+    num_bytes += len(word.encode('utf-8'))
+  return ''.join(words)
+
+
+def GenerateCorpus(kind, size, seed=0):
+  """Generate a reproducible corpus of about size bytes in UTF-8.
+
+  Args:
+    kind: One of CORPUS_KINDS. hangul is random syllables, mixed is half
+        ASCII words, jamo is mostly runs of compatibility jamos like ㅋㅋㅋ,
+        and romanized is the hangul corpus with bracketed romanization.
+    size: Approximate size in bytes.
+    seed: Seed of the random generator.
+  """
+  block = _GenerateBlock(kind, min(size, _BLOCK_SIZE), seed)
+  if size <= _BLOCK_SIZE:
+    return block
+  return block * (size // len(block.encode('utf-8')) + 1)
+
+
+def _Words(text):
+  return text.split()
+
+
+def _JamoDeletionIndex(text):
+  """Index the words of text and pick every tenth word as a query."""
+  words = _Words(text)
+  return hangul_search.JamoDeletionIndex(words, max_distance=1), words[::10]
+
+
+# Benchmarks are (name, corpus kind, setup, function). setup turns the corpus
+# into the argument of function, and is not measured.
+BENCHMARKS = (
+  ('RomanizeHangulString', 'hangul', None, hangul.RomanizeHangulString),
+  ('RomanizeHangulString', 'mixed', None, hangul.RomanizeHangulString),
+  ('UnromanizeHangulString', 'romanized', None,
+   hangul.UnromanizeHangulString),
+  ('GetInitialCharacter', 'mixed', _Words,
+   lambda words: [hangul.GetInitialCharacter(word) for word in words]),
+  ('AppendHangulPostfix', 'hangul', _Words,
+   lambda words: [hangul.AppendHangulPostfix(word, '를', '을')
+                  for word in words]),
+  ('IsHangulJamos', 'jamo', _Words,
+   lambda words: [hangul.IsHangulJamos(word) for word in words]),
+  ('JamoDeletionIndex', 'hangul', _Words,
+   lambda words: hangul_search.JamoDeletionIndex(words, max_distance=1)),
+  ('JamoDeletionIndex.Search', 'hangul', _JamoDeletionIndex,
+   lambda index_queries: [index_queries[0].Search(query)
+                          for query in index_queries[1]]),
+)
+
+
+def RunBenchmarks(sizes, repeat=3, seed=0, measure_memory=True,
+                  benchmarks=BENCHMARKS):
+  """Run benchmarks on corpora of every size.
+
+  Returns:
+    Dict from 'name/kind/size' to a dict with seconds, the best time of
+    repeat runs, bytes_per_second, and peak_bytes of Python allocations if
+    measure_memory is True.
+  """
+  results = {}
+  corpora = {}
+  for size in sizes:
+    for name, kind, setup, function in benchmarks:
+      corpus = corpora.get((kind, size))
+      if corpus is None:
+        corpus = corpora[(kind, size)] = GenerateCorpus(kind, size, seed)
+      argument = setup(corpus) if setup else corpus
+      # Warm up so that lazily built tables are not measured.
+      function(argument)
+      seconds = float('inf')
+      for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        seconds = min(seconds, time.perf_counter() - start)
+      result = {'seconds': seconds,
+                'bytes_per_second': size / seconds if seconds else 0.0}
+      if measure_memory:
+        tracemalloc.start()
+        try:
+          function(argument)
+          result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+          tracemalloc.stop()
+      results['%s/%s/%d' % (name, kind, size)] = result
+    corpora.clear()
+  return results
+
+
+def CompareResults(results, baseline, threshold):
+  """Return descriptions of results worse than baseline by threshold."""
+  regressions = []
+  for key, result in sorted(results.items()):
+    expected = baseline.get(key)
+    if not expected:
+      continue
+    if (result['bytes_per_second'] <
+        expected['bytes_per_second'] * (1 - threshold)):
+      regressions.append('%s: throughput %.1f MB/s < baseline %.1f MB/s' % (
+        key, result['bytes_per_second'] / 1e6,
+        expected['bytes_per_second'] / 1e6))
+    if ('peak_bytes' in result and 'peak_bytes' in expected and
+        result['peak_bytes'] > expected['peak_bytes'] * (1 + threshold)):
+      regressions.append('%s: peak memory %d bytes > baseline %d bytes' % (
+        key, result['peak_bytes'], expected['peak_bytes']))
+  return regressions
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--sizes', default='1KB,64KB,1MB',
+                      help='comma separated corpus sizes up to 1GB')
+  parser.add_argument('--repeat', type=int, default=3)
+  parser.add_argument('--seed', type=int, default=0)
+  parser.add_argument('--no-memory', action='store_true',
+                      help='skip peak memory measurement')
+  parser.add_argument('--baseline', help='JSON file to compare against')
+  parser.add_argument('--save-baseline', help='JSON file to save results to')
+  parser.add_argument('--threshold', type=float, default=0.2,
+                      help='allowed relative regression')
+  args = parser.parse_args(argv)
+
+  sizes = [ParseSize(size) for size in args.sizes.split(',')]
+  results = RunBenchmarks(sizes, args.repeat, args.seed, not args.no_memory)
+  for key, result in sorted(results.items()):
+    print('%-50s %10.2f MB/s %12s bytes' % (
+      key, result['bytes_per_second'] / 1e6, result.get('peak_bytes', '-')))
+
+  if args.save_baseline:
+    with open(args.save_baseline, 'w') as baseline_file:
+      json.dump(results, baseline_file, indent=2, sort_keys=True)
+  if args.baseline:
+    with open(args.baseline) as baseline_file:
+      regressions = CompareResults(results, json.load(baseline_file),
+                                   args.threshold)
+    for regression in regressions:
+      print('REGRESSION ' + regression)
+    if regressions:
+      return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import unittest
+import hangul
+import hangul_bench
+
+
+class TestHangulBench(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testParseSize(self):
+    self.assertEqual(1024, hangul_bench.ParseSize('1KB'))
+    self.assertEqual(3 << 20, hangul_bench.ParseSize('3mb'))
+    self.assertEqual(1 << 30, hangul_bench.ParseSize('1G'))
+    self.assertEqual(100, hangul_bench.ParseSize('100'))
+    self.assertRaises(ValueError, hangul_bench.ParseSize, '1TB')
+
+  def testGenerateCorpus(self):
+    for kind in hangul_bench.CORPUS_KINDS:
+      corpus = hangul_bench.GenerateCorpus(kind, 4096, seed=1)
+      self.assertEqual(corpus, hangul_bench.GenerateCorpus(kind, 4096, seed=1))
+      self.assertNotEqual(corpus,
+                          hangul_bench.GenerateCorpus(kind, 4096, seed=2))
+      self.assertLessEqual(4096 // 2, len(corpus.encode('utf-8')))
+    corpus = hangul_bench.GenerateCorpus('romanized', 4096)
+    self.assertEqual(hangul_bench.GenerateCorpus('hangul', 2048),
+                     hangul.UnromanizeHangulString(corpus))
+
+  def testRunBenchmarks(self):
+    results = hangul_bench.RunBenchmarks([1024], repeat=1)
+    self.assertEqual(len(hangul_bench.BENCHMARKS), len(results))
+    result = results['RomanizeHangulString/hangul/1024']
+    self.assertLess(0, result['bytes_per_second'])
+    self.assertLess(0, result['peak_bytes'])
+
+  def testCompareResults(self):
+    baseline = {'a': {'bytes_per_second': 100.0, 'peak_bytes': 1000},
+                'b': {'bytes_per_second': 100.0, 'peak_bytes': 1000}}
+    results = {'a': {'bytes_per_second': 85.0, 'peak_bytes': 1100},
+               'b': {'bytes_per_second': 70.0, 'peak_bytes': 1300},
+               'c': {'bytes_per_second': 1.0}}
+    self.assertEqual(2, len(hangul_bench.CompareResults(results, baseline,
+                                                        0.2)))
+    self.assertEqual([], hangul_bench.CompareResults(results, baseline, 0.5))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Command line converter for large UTF-8 text files.
+
+Files are memory-mapped and split into chunks ending at line breaks, which
+are converted by a process pool and written in input order. Standard input
+is converted line by line.
+
+  python3 hangul_cli.py romanize input.txt -o output.txt
+  python3 -m hangul unromanize - < input.txt
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import io
+import mmap
+import os
+import re
+import sys
+
+import hangul
+
+_LINE_PATTERN = re.compile(r'[^\n]*\n|[^\n]+')
+
+
+def _ConvertText(text, operation, options):
+  """Apply a command line operation to text made of whole lines."""
+  if operation == 'romanize':
+    return hangul.RomanizeHangulString(text, prefix=options['prefix'],
+                                       postfix=options['postfix'])
+  if operation == 'unromanize':
+    return hangul.UnromanizeHangulString(text, prefix=options['prefix'],
+                                         postfix=options['postfix'])
+  converted_lines = []
+  # Only \n ends a line, unlike str.splitlines() which also splits on form
+  # feeds and other separators inside a physical line.
+  for line in _LINE_PATTERN.findall(text):
+    body = line[:-1] if line.endswith('\n') else line
+    if body.endswith('\r'):
+      body = body[:-1]
+    line_ending = line[len(body):]
+    if operation == 'initials':
+      body = hangul.GetInitialCharacter(body) or ''
+    else:
+      body = hangul.AppendHangulPostfix(body, options['no_cons'],
+                                        options['cons'])
+    converted_lines.append(body + line_ending)
+  return ''.join(converted_lines)
+
+
+def _LineAlignedChunks(mapped, chunk_size):
+  """Yield (start, end) offsets of chunks ending right after a newline."""
+  start = 0
+  size = len(mapped)
+  while start < size:
+    end = mapped.find(b'\n', min(start + chunk_size, size) - 1)
+    end = size if end == -1 else end + 1
+    yield start, end
+    start = end
+
+
+def _ConvertFileChunk(path, start, end, operation, options):
+  """Convert a byte range of a UTF-8 file. Runs in worker processes."""
+  with open(path, 'rb') as input_file:
+    with mmap.mmap(input_file.fileno(), 0,
+                   access=mmap.ACCESS_READ) as mapped:
+      text = mapped[start:end].decode('utf-8')
+  return _ConvertText(text, operation, options).encode('utf-8')
+
+
+def _ConvertFile(path, output, operation, options, jobs, chunk_size):
+  """Convert a file with a process pool, writing chunks in input order."""
+  with open(path, 'rb') as input_file:
+    if not os.fstat(input_file.fileno()).st_size:
+      return
+    with mmap.mmap(input_file.fileno(), 0,
+                   access=mmap.ACCESS_READ) as mapped:
+      chunks = list(_LineAlignedChunks(mapped, chunk_size))
+  if jobs <= 1 or len(chunks) <= 1:
+    for start, end in chunks:
+      output.write(_ConvertFileChunk(path, start, end, operation, options))
+    return
+  with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+    # Bound the number of converted chunks waiting to be written.
+    pending = collections.deque()
+    for start, end in chunks:
+      pending.append(executor.submit(_ConvertFileChunk, path, start, end,
+                                     operation, options))
+      if len(pending) >= 2 * jobs:
+        output.write(pending.popleft().result())
+    while pending:
+      output.write(pending.popleft().result())
+
+
+def _ConvertLines(input_stream, output, operation, options, chunk_size):
+  """Convert a UTF-8 byte stream which cannot be memory-mapped."""
+  text_stream = io.TextIOWrapper(input_stream, encoding='utf-8',
+                                 newline='\n')
+  try:
+    for lines in iter(lambda: text_stream.readlines(chunk_size), []):
+      output.write(_ConvertText(''.join(lines), operation,
+                                options).encode('utf-8'))
+  finally:
+    text_stream.detach()
+
+
+def main(argv=None):
+  """Command line entry point for python -m hangul and hangul_cli.py."""
+  parser = argparse.ArgumentParser(
+    description='Convert UTF-8 text files line by line.')
+  parser.add_argument('operation',
+                      choices=('romanize', 'unromanize', 'initials', 'josa'))
+  parser.add_argument('input', help='input file, or - for standard input')
+  parser.add_argument('-o', '--output', default='-',
+                      help='output file, or - for standard output')
+  parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                      help='number of worker processes')
+  parser.add_argument('--chunk-size', type=int, default=4 << 20,
+                      help='approximate bytes per chunk given to a worker')
+  parser.add_argument('--prefix', default='[')
+  parser.add_argument('--postfix', default=']')
+  parser.add_argument('--no-cons', default='',
+                      help='josa for lines without final consonants')
+  parser.add_argument('--cons', default='',
+                      help='josa for lines with final consonants')
+  args = parser.parse_args(argv)
+  if args.chunk_size < 1:
+    parser.error('--chunk-size must be positive')
+  options = {'prefix': args.prefix, 'postfix': args.postfix,
+             'no_cons': args.no_cons, 'cons': args.cons}
+
+  if args.output == '-':
+    output = sys.stdout.buffer
+  else:
+    output = open(args.output, 'wb')
+  try:
+    if args.input == '-':
+      _ConvertLines(sys.stdin.buffer, output, args.operation, options,
+                    args.chunk_size)
+    else:
+      _ConvertFile(args.input, output, args.operation, options, args.jobs,
+                   args.chunk_size)
+  finally:
+    if output is sys.stdout.buffer:
+      output.flush()
+    else:
+      output.close()
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import io
+import os
+import tempfile
+import unittest
+import hangul
+import hangul_cli
+
+
+class TestHangulCli(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testMain(self):
+    text = '이순신\r\nMichael\n\n수공\n전략가'
+    with tempfile.TemporaryDirectory() as directory:
+      input_path = os.path.join(directory, 'input.txt')
+      output_path = os.path.join(directory, 'output.txt')
+      with open(input_path, 'w', encoding='utf-8', newline='') as input_file:
+        input_file.write(text)
+
+      def Convert(*args):
+        self.assertEqual(0, hangul_cli.main(list(args) + [input_path,
+                                                          '-o', output_path]))
+        with open(output_path, encoding='utf-8', newline='') as output_file:
+          return output_file.read()
+
+      romanized = hangul.RomanizeHangulString(text)
+      for jobs in ('1', '2'):
+        self.assertEqual(
+          romanized, Convert('romanize', '-j', jobs, '--chunk-size', '5'))
+      self.assertEqual(
+        '(i)(sun)(sin)\r\nMichael\n\n(su)(gong)\n(jeon)(ryag)(ga)',
+        Convert('romanize', '--prefix', '(', '--postfix', ')'))
+      self.assertEqual('ㅇ\r\nM\n\nㅅ\nㅈ', Convert('initials', '-j', '2',
+                                                  '--chunk-size', '1'))
+      self.assertEqual('이순신을\r\nMichael를\n를\n수공을\n전략가를',
+                       Convert('josa', '--no-cons', '를', '--cons', '을'))
+
+      with open(input_path, 'w', encoding='utf-8', newline='') as input_file:
+        input_file.write(romanized)
+      self.assertEqual(text, Convert('unromanize', '-j', '2',
+                                     '--chunk-size', '3'))
+
+      # Only \n ends a line, so each physical line gives one result.
+      text = '가\x0c나\n다\r라\u2028마\r\n바\x85'
+      with open(input_path, 'w', encoding='utf-8', newline='') as input_file:
+        input_file.write(text)
+      self.assertEqual('ㄱ\nㄷ\r\nㅂ', Convert('initials', '-j', '2',
+                                              '--chunk-size', '1'))
+      for chunk_size in (1, 100):
+        output = io.BytesIO()
+        hangul_cli._ConvertLines(io.BytesIO(text.encode('utf-8')), output,
+                                 'initials', {}, chunk_size)
+        self.assertEqual('ㄱ\nㄷ\r\nㅂ', output.getvalue().decode('utf-8'))
+
+      with open(input_path, 'w') as input_file:
+        pass
+      self.assertEqual('', Convert('romanize'))
+
+
+if __name__ == '__main__':
+  unittest.main()
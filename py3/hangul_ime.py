@@ -0,0 +1,351 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Keyboard input of hangul."""
+
+import functools
+import itertools
+import re
+
+import hangul
+
+_INITIAL_INDEXES = dict((jamo, index)
+                        for index, jamo in enumerate(hangul.INITIAL_JAMOS))
+_MEDIAL_INDEXES = dict((jamo, index)
+                       for index, jamo in enumerate(hangul.MEDIAL_JAMOS))
+_FINAL_INDEXES = dict((jamo, index)
+                      for index, jamo in enumerate(hangul.FINAL_JAMOS) if jamo)
+
+# Jamos typed in a row which make a single compound jamo.
+COMPOUND_MEDIALS = {
+  ('ㅗ', 'ㅏ'): 'ㅘ', ('ㅗ', 'ㅐ'): 'ㅙ', ('ㅗ', 'ㅣ'): 'ㅚ',
+  ('ㅜ', 'ㅓ'): 'ㅝ', ('ㅜ', 'ㅔ'): 'ㅞ', ('ㅜ', 'ㅣ'): 'ㅟ',
+  ('ㅡ', 'ㅣ'): 'ㅢ'}
+COMPOUND_FINALS = {
+  ('ㄱ', 'ㅅ'): 'ㄳ', ('ㄴ', 'ㅈ'): 'ㄵ', ('ㄴ', 'ㅎ'): 'ㄶ',
+  ('ㄹ', 'ㄱ'): 'ㄺ', ('ㄹ', 'ㅁ'): 'ㄻ', ('ㄹ', 'ㅂ'): 'ㄼ',
+  ('ㄹ', 'ㅅ'): 'ㄽ', ('ㄹ', 'ㅌ'): 'ㄾ', ('ㄹ', 'ㅍ'): 'ㄿ',
+  ('ㄹ', 'ㅎ'): 'ㅀ', ('ㅂ', 'ㅅ'): 'ㅄ'}
+
+_SPLIT_MEDIALS = dict((compound, jamos)
+                      for jamos, compound in COMPOUND_MEDIALS.items())
+_SPLIT_FINALS = dict((compound, jamos)
+                     for jamos, compound in COMPOUND_FINALS.items())
+
+
+# QWERTY keys of each jamo on 2-beolsik. Shift types the tense consonants,
+# ㅒ and ㅖ. Other letters type the same jamo with or without shift.
+DUBEOLSIK_KEYS = {
+  'ㅂ': 'q', 'ㅈ': 'w', 'ㄷ': 'e', 'ㄱ': 'r', 'ㅅ': 't', 'ㅛ': 'y', 'ㅕ': 'u',
+  'ㅑ': 'i', 'ㅐ': 'o', 'ㅔ': 'p', 'ㅁ': 'a', 'ㄴ': 's', 'ㅇ': 'd', 'ㄹ': 'f',
+  'ㅎ': 'g', 'ㅗ': 'h', 'ㅓ': 'j', 'ㅏ': 'k', 'ㅣ': 'l', 'ㅋ': 'z', 'ㅌ': 'x',
+  'ㅊ': 'c', 'ㅍ': 'v', 'ㅠ': 'b', 'ㅜ': 'n', 'ㅡ': 'm',
+  'ㅃ': 'Q', 'ㅉ': 'W', 'ㄸ': 'E', 'ㄲ': 'R', 'ㅆ': 'T', 'ㅒ': 'O', 'ㅖ': 'P'}
+
+_HANGUL_TO_QWERTY_TABLE = str.maketrans(DUBEOLSIK_KEYS)
+_QWERTY_TO_HANGUL_TABLE = str.maketrans(dict(
+  [(key.upper(), jamo) for jamo, key in DUBEOLSIK_KEYS.items()] +
+  [(key, jamo) for jamo, key in DUBEOLSIK_KEYS.items()]))
+
+
+@functools.lru_cache(maxsize=None)
+def _KeystrokeTable():
+  """Return a str.translate() table from syllables to keystroke jamos."""
+  table = dict((ord(compound), ''.join(jamos))
+               for compound, jamos in itertools.chain(_SPLIT_MEDIALS.items(),
+                                                      _SPLIT_FINALS.items()))
+  num_initials, num_medials, num_finals = hangul.NUM_JAMOS
+  num_characters = num_initials * num_medials * num_finals
+  for hangul_index in range(num_characters):
+    initial, medial, final = hangul.DecomposeHangulIndex(hangul_index,
+                                                         hangul.NUM_JAMOS)
+    medial = hangul.MEDIAL_JAMOS[medial]
+    final = hangul.FINAL_JAMOS[final]
+    table[ord(hangul.ChrHangul(hangul_index))] = ''.join(itertools.chain(
+      hangul.INITIAL_JAMOS[initial], _SPLIT_MEDIALS.get(medial, medial),
+      _SPLIT_FINALS.get(final, final)))
+  return table
+
+
+def Keystrokes(unicode_string):
+  """Return the compatibility jamos typed for a string on 2-beolsik.
+
+  Syllables and compound jamos are split, so 값 and 과 become ㄱㅏㅂㅅ and
+  ㄱㅗㅏ. Other characters are kept as they are.
+  """
+  return unicode_string.translate(_KeystrokeTable())
+
+
+class HangulComposer(object):
+  """Compose syllables from compatibility jamos typed one at a time.
+
+  This follows the 2-beolsik keyboard: ㄱ, ㅏ, ㄴ, ㅏ becomes 가나, with the
+  final ㄴ of 간 moving over to the next syllable when ㅏ is typed. Every
+  operation takes constant time.
+
+    composer = HangulComposer()
+    for jamo in 'ㄱㅏㄴㅏ':
+      composer.Input(jamo)
+    composer.text  # '가나'
+  """
+
+  __slots__ = ('_committed', '_initial', '_medial', '_final')
+
+  def __init__(self):
+    self._committed = []
+    self._initial = None
+    self._medial = None
+    self._final = None
+
+  @property
+  def committed_text(self):
+    """Text which can no longer change except by Backspace()."""
+    return ''.join(self._committed)
+
+  @property
+  def composing_text(self):
+    """The syllable being composed, or an empty string."""
+    if self._initial is None or self._medial is None:
+      return self._initial or self._medial or ''
+    jamo_indexes = (_INITIAL_INDEXES[self._initial],
+                    _MEDIAL_INDEXES[self._medial],
+                    _FINAL_INDEXES.get(self._final, 0))
+    return hangul.ChrHangul(hangul.ComposeHangulIndex(jamo_indexes,
+                                                      hangul.NUM_JAMOS))
+
+  @property
+  def text(self):
+    """Committed and composing text."""
+    return self.committed_text + self.composing_text
+
+  def _Commit(self):
+    composing_text = self.composing_text
+    if composing_text:
+      self._committed.append(composing_text)
+    self._initial = self._medial = self._final = None
+
+  def Input(self, character):
+    """Type a single character.
+
+    Compatibility jamos are composed, and any other character commits the
+    syllable being composed and is added as it is.
+    """
+    if character in _MEDIAL_INDEXES:
+      self._InputMedial(character)
+    elif character in _INITIAL_INDEXES or character in _FINAL_INDEXES:
+      self._InputConsonant(character)
+    else:
+      self._Commit()
+      self._committed.append(character)
+
+  def InputString(self, string):
+    """Type every character of a string."""
+    for character in string:
+      self.Input(character)
+
+  def _InputConsonant(self, consonant):
+    if self._medial is not None and self._initial is not None:
+      if self._final is None:
+        if consonant in _FINAL_INDEXES:
+          self._final = consonant
+          return
+      else:
+        compound = COMPOUND_FINALS.get((self._final, consonant))
+        if compound is not None:
+          self._final = compound
+          return
+    self._Commit()
+    if consonant in _INITIAL_INDEXES:
+      self._initial = consonant
+    else:
+      self._committed.append(consonant)
+
+  def _InputMedial(self, medial):
+    if self._final is not None:
+      # The last consonant of the final moves over to the next syllable.
+      first, last = _SPLIT_FINALS.get(self._final, (None, self._final))
+      self._final = first
+      self._Commit()
+      self._initial = last
+      self._medial = medial
+      return
+    if self._medial is not None:
+      compound = COMPOUND_MEDIALS.get((self._medial, medial))
+      if compound is not None:
+        self._medial = compound
+        return
+      self._Commit()
+    self._medial = medial
+
+  def Backspace(self):
+    """Delete the last jamo being composed, or the last committed character.
+
+    Returns:
+      False if there was nothing to delete, True otherwise.
+    """
+    if self._final is not None:
+      self._final = _SPLIT_FINALS.get(self._final, (None,))[0]
+    elif self._medial is not None:
+      self._medial = _SPLIT_MEDIALS.get(self._medial, (None,))[0]
+    elif self._initial is not None:
+      self._initial = None
+    elif self._committed:
+      self._committed.pop()
+    else:
+      return False
+    return True
+
+  def Flush(self):
+    """Commit everything and return the text, leaving the composer empty."""
+    self._Commit()
+    text = ''.join(self._committed)
+    self._committed = []
+    return text
+
+
+def QwertyToHangul(keys):
+  """Return the text typed by QWERTY keys on 2-beolsik, e.g. dkssud is 안녕.
+
+  Characters other than letters are kept as they are.
+  """
+  composer = HangulComposer()
+  composer.InputString(keys.translate(_QWERTY_TO_HANGUL_TABLE))
+  return composer.Flush()
+
+
+def HangulToQwerty(unicode_string):
+  """Return the QWERTY keys which type the string on 2-beolsik.
+
+  This is the inverse of QwertyToHangul(), e.g. 안녕 is dkssud. Characters
+  other than hangul are kept as they are.
+  """
+  return Keystrokes(unicode_string).translate(_HANGUL_TO_QWERTY_TABLE)
+
+
+_LETTER_PATTERN = re.compile('[A-Za-z]')
+_LONE_JAMO_PATTERN = re.compile('[\u3131-\u3163]')
+_LONE_VOWEL_PATTERN = re.compile('[\u314f-\u3163]')
+_ENGLISH_VOWEL_PATTERN = re.compile('[AEIOUaeiou]')
+_ENGLISH_WORD_PATTERN = re.compile('[a-z]+')
+
+# Costs are about -2 * log10 of probabilities, so every 2 is a factor of 10.
+# Jamo costs are of each jamo in a syllable of Korean text, in the order of
+# hangul.INITIAL_JAMOS, MEDIAL_JAMOS and FINAL_JAMOS.
+_INITIAL_COSTS = (2, 4, 2, 2, 4, 3, 3, 3, 5, 2, 5, 1, 2, 5, 3, 4, 4, 4, 2)
+_MEDIAL_COSTS = (1, 3, 4, 7, 2, 3, 3, 5, 2, 3, 6, 4, 4, 2, 4, 6, 4, 4, 2, 3,
+                 2)
+_FINAL_COSTS = (1, 3, 6, 7, 2, 7, 7, 5, 2, 7, 7, 7, 7, 7, 7, 7, 3, 3, 7, 4,
+                3, 2, 5, 5, 7, 5, 5, 5)
+
+# Costs of a letter following another in English words. Rows are the
+# previous letter, or ^ at the start of a word. Columns are the next letter
+# from a to z, then the end of the word.
+_ENGLISH_BIGRAM_COSTS = (
+  '232333442653332353223435569',  # ^
+  '733375373842229382224455472',  # a
+  '253416663282553463352797273',  # b
+  '284527722932561663423789593',  # c
+  '354316682684653594353667591',  # d
+  '353243465863325452226453471',  # e
+  '285533692993662672543779591',  # f
+  '466716432973534593342579751',  # g
+  '297716872985552894545899692',  # h
+  '443332496852312463227394944',  # i
+  '477706776757762677772777672',  # j
+  '375416483883534376254538781',  # k
+  '255313662962652495333659362',  # l
+  '136517873964352295453869592',  # m
+  '263224263844642487224479471',  # n
+  '533252484943314392333435772',  # o
+  '265525843952562382423669392',  # p
+  '657477767775647773770777772',  # q
+  '254414372845332583333459381',  # r
+  '474725633855553366223669491',  # s
+  '375525912974562493343857471',  # t
+  '433424493982225391225997984',  # u
+  '167815572887564567567778663',  # v
+  '266526711884732782358855882',  # w
+  '252524752885585285517684551',  # x
+  '655435583884433275228648560',  # y
+  '364704772775353775647777552',  # z
+)
+
+# Retyped hangul has to be this much cheaper than English, and have at least
+# this many syllables, as single syllables like 솓 for the are too easily
+# typed by English words.
+_MIN_COST_MARGIN = 2
+_MIN_RETYPED_SYLLABLES = 2
+
+
+def _EnglishCost(query):
+  """Return the cost of the words of query as English."""
+  cost = 0
+  for word in _ENGLISH_WORD_PATTERN.findall(query.lower()):
+    row = 0
+    for letter in word:
+      column = ord(letter) - ord('a')
+      cost += int(_ENGLISH_BIGRAM_COSTS[row][column])
+      row = column + 1
+    cost += int(_ENGLISH_BIGRAM_COSTS[row][-1])
+  return cost
+
+
+def _RetypeQwertyHangul(query):
+  """Return QwertyToHangul(query) if it looks mistyped, or None.
+
+  Every word has to type whole syllables which are likelier as Korean than
+  the letters are as English.
+  """
+  if not query.isascii() or _LETTER_PATTERN.search(query) is None:
+    return None
+  hangul_string = QwertyToHangul(query)
+  if _LONE_JAMO_PATTERN.search(hangul_string) is not None:
+    return None
+  cost = 0
+  num_syllables = 0
+  for character in hangul_string:
+    jamo_indexes = hangul.DecomposeHangul(character, hangul.JAMO_ROMANIZATIONS)
+    if jamo_indexes is not None:
+      initial, medial, final = jamo_indexes
+      cost += (_INITIAL_COSTS[initial] + _MEDIAL_COSTS[medial] +
+               _FINAL_COSTS[final])
+      num_syllables += 1
+  if (num_syllables < _MIN_RETYPED_SYLLABLES or
+      cost + _MIN_COST_MARGIN >= _EnglishCost(query)):
+    return None
+  return hangul_string
+
+
+def LooksLikeQwertyHangul(query):
+  """Return True if query looks like hangul typed with the IME off.
+
+  Every word of letters has to type whole syllables, as dkssud does for 안녕.
+  English words almost always leave lone jamos, as hello gives ㅗ디ㅣㅐ.
+  Those which do not, such as the for 솓, are told apart by how likely the
+  letters are in English and the syllables are in Korean.
+  """
+  return _RetypeQwertyHangul(query) is not None
+
+
+def LooksLikeHangulQwerty(query):
+  """Return True if query looks like English typed with the IME on.
+
+  The IME leaves a vowel jamo alone only when it does not follow a consonant,
+  as in ㅗ디ㅣㅐ for hello. Queries such as ㅠㅠ, whose keys have no English
+  vowel, are not taken as English.
+  """
+  return (_LONE_VOWEL_PATTERN.search(query) is not None and
+          _ENGLISH_VOWEL_PATTERN.search(HangulToQwerty(query)) is not None)
+
+
+def CorrectKeyboardLayout(query):
+  """Return the query retyped in the other layout if it looks mistyped."""
+  hangul_string = _RetypeQwertyHangul(query)
+  if hangul_string is not None:
+    return hangul_string
+  if _LONE_VOWEL_PATTERN.search(query) is not None:
+    keys = HangulToQwerty(query)
+    if _ENGLISH_VOWEL_PATTERN.search(keys) is not None:
+      return keys
+  return query
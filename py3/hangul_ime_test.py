@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import unittest
+import hangul
+import hangul_ime
+
+
+def Compose(keys):
+  composer = hangul_ime.HangulComposer()
+  composer.InputString(keys)
+  return composer
+
+
+class TestHangulIme(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testHangulComposer(self):
+    self.assertEqual('가나', Compose('ㄱㅏㄴㅏ').text)
+    self.assertEqual('간', Compose('ㄱㅏㄴ').text)
+    self.assertEqual('한국어', Compose('ㅎㅏㄴㄱㅜㄱㅇㅓ').text)
+    self.assertEqual('과자', Compose('ㄱㅗㅏㅈㅏ').text)
+    self.assertEqual('닭', Compose('ㄷㅏㄹㄱ').text)
+    self.assertEqual('달가', Compose('ㄷㅏㄹㄱㅏ').text)
+    self.assertEqual('앉아', Compose('ㅇㅏㄴㅈㅇㅏ').text)
+    self.assertEqual('ㄱㄴ', Compose('ㄱㄴ').text)
+    self.assertEqual('ㅏㅓ', Compose('ㅏㅓ').text)
+    self.assertEqual('ㅘ', Compose('ㅗㅏ').text)
+    self.assertEqual('ㅏ가', Compose('ㅏㄱㅏ').text)
+    self.assertEqual('아ㄸ', Compose('ㅇㅏㄸ').text)
+    self.assertEqual('ㄳ', Compose('ㄳ').text)
+    self.assertEqual('가 나!', Compose('ㄱㅏ ㄴㅏ!').text)
+
+    composer = Compose('ㄱㅏㄴ')
+    self.assertEqual('', composer.committed_text)
+    self.assertEqual('간', composer.composing_text)
+    composer.Input('ㅏ')
+    self.assertEqual('가', composer.committed_text)
+    self.assertEqual('나', composer.composing_text)
+
+  def testBackspace(self):
+    composer = Compose('ㄱㅗㅏㄹㄱ')
+    self.assertEqual('괅', composer.text)
+    expected = ['괄', '과', '고', 'ㄱ', '']
+    for text in expected:
+      self.assertTrue(composer.Backspace())
+      self.assertEqual(text, composer.text)
+    self.assertFalse(composer.Backspace())
+
+    composer = Compose('ㄱㅏㄴㅏ')
+    composer.Backspace()
+    self.assertEqual('가ㄴ', composer.text)
+    composer.Backspace()
+    composer.Backspace()
+    self.assertEqual('', composer.text)
+
+  def testFlush(self):
+    composer = Compose('ㄱㅏㄴ')
+    self.assertEqual('간', composer.Flush())
+    self.assertEqual('', composer.text)
+    composer.Input('ㅏ')
+    self.assertEqual('ㅏ', composer.text)
+
+
+  def testKeystrokes(self):
+    self.assertEqual('ㄱㅏㅂㅅ ㄱㅗㅏㅈㅏ', hangul_ime.Keystrokes('값 과자'))
+    self.assertEqual('ㅗㅏㄹㄱa', hangul_ime.Keystrokes('ㅘㄺa'))
+    self.assertEqual('', hangul_ime.Keystrokes(''))
+    for hangul_index in range(0, 11172, 7):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(character,
+                       Compose(hangul_ime.Keystrokes(character)).text)
+
+  def testQwertyToHangul(self):
+    self.assertEqual('안녕하세요', hangul_ime.QwertyToHangul('dkssudgktpdy'))
+    self.assertEqual('까치 1', hangul_ime.QwertyToHangul('Rkcl 1'))
+    self.assertEqual('값', hangul_ime.QwertyToHangul('rkqt'))
+    self.assertEqual('ㅗ디ㅣㅐ', hangul_ime.QwertyToHangul('hello'))
+    self.assertEqual('', hangul_ime.QwertyToHangul(''))
+
+  def testHangulToQwerty(self):
+    self.assertEqual('dkssudgktpdy', hangul_ime.HangulToQwerty('안녕하세요'))
+    self.assertEqual('Rkcl 1', hangul_ime.HangulToQwerty('까치 1'))
+    self.assertEqual('hello', hangul_ime.HangulToQwerty('ㅗ디ㅣㅐ'))
+    for hangul_index in range(0, 11172, 7):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(character, hangul_ime.QwertyToHangul(
+        hangul_ime.HangulToQwerty(character)))
+
+  def testLooksLikeQwertyHangul(self):
+    self.assertTrue(hangul_ime.LooksLikeQwertyHangul('dkssud tptkd'))
+    self.assertTrue(hangul_ime.LooksLikeQwertyHangul('vkdlTjs'))
+    self.assertFalse(hangul_ime.LooksLikeQwertyHangul('hello world'))
+    self.assertFalse(hangul_ime.LooksLikeQwertyHangul('the cat'))
+    self.assertFalse(hangul_ime.LooksLikeQwertyHangul('안녕'))
+    self.assertFalse(hangul_ime.LooksLikeQwertyHangul('123'))
+    self.assertFalse(hangul_ime.LooksLikeQwertyHangul(''))
+    # English words which type whole syllables are left alone.
+    for query in ('the', 'and', 'for', 'go', 'to', 'do', 'so', 'dog', 'did',
+                  'she', 'with', 'then', 'also', 'when', 'than', 'work',
+                  'right', 'the end'):
+      self.assertFalse(hangul_ime.LooksLikeQwertyHangul(query), query)
+    for query in ('rkskek', 'gksrnrdj', 'dkssudgktpdy', 'tjdnf'):
+      self.assertTrue(hangul_ime.LooksLikeQwertyHangul(query), query)
+
+  def testLooksLikeHangulQwerty(self):
+    self.assertTrue(hangul_ime.LooksLikeHangulQwerty('ㅗ디ㅣㅐ'))
+    self.assertTrue(hangul_ime.LooksLikeHangulQwerty('ㅔㅛ소ㅐㅜ'))
+    self.assertFalse(hangul_ime.LooksLikeHangulQwerty('ㅠㅠ'))
+    self.assertFalse(hangul_ime.LooksLikeHangulQwerty('ㄱㅈㅇ'))
+    self.assertFalse(hangul_ime.LooksLikeHangulQwerty('안녕하세요'))
+    self.assertFalse(hangul_ime.LooksLikeHangulQwerty('hello'))
+
+  def testCorrectKeyboardLayout(self):
+    self.assertEqual('안녕 세상', hangul_ime.CorrectKeyboardLayout('dkssud tptkd'))
+    self.assertEqual('python', hangul_ime.CorrectKeyboardLayout('ㅔㅛ소ㅐㅜ'))
+    for query in ('hello', '안녕', 'ㅠㅠ', '2PM', '', 'the', 'and', 'go'):
+      self.assertEqual(query, hangul_ime.CorrectKeyboardLayout(query))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""NumPy batch versions of the hangul index functions.
+
+This module requires numpy, which the hangul module itself does not.
+"""
+
+import numpy
+
+import hangul
+
+
+def CodePoints(unicode_string):
+  """Return code points of a string as a uint32 array without copying."""
+  return numpy.frombuffer(unicode_string.encode('utf-32-le'), dtype='<u4')
+
+
+def StringFromCodePoints(code_points):
+  """Return a string from an array of code points."""
+  return numpy.asarray(code_points, dtype='<u4').tobytes().decode('utf-32-le')
+
+
+def DecomposeHangulIndexArray(hangul_indexes, num_jamos):
+  """Batch version of hangul.DecomposeHangulIndex().
+
+  Args:
+    hangul_indexes: Array of hangul indexes starting from 0 for [ga].
+    num_jamos: Number of each CVC jamo family which is (19, 21, 28)
+        for unicode character.
+
+  Returns:
+    Array of jamo indexes with an extra last axis of len(num_jamos).
+  """
+  hangul_indexes = numpy.asarray(hangul_indexes, dtype=numpy.int64)
+  jamo_indexes = numpy.empty(hangul_indexes.shape + (len(num_jamos),),
+                             dtype=numpy.int64)
+  for column in reversed(range(len(num_jamos))):
+    hangul_indexes, jamo_indexes[..., column] = numpy.divmod(
+      hangul_indexes, num_jamos[column])
+  return jamo_indexes
+
+
+def ComposeHangulIndexArray(jamo_indexes, num_jamos):
+  """Batch version of hangul.ComposeHangulIndex().
+
+  Args:
+    jamo_indexes: Array of jamo indexes whose last axis is len(num_jamos).
+    num_jamos: Number of each CVC jamo family which is (19, 21, 28)
+        for unicode character.
+
+  Returns:
+    Array of hangul indexes starting from 0 for [ga].
+  """
+  jamo_indexes = numpy.asarray(jamo_indexes)
+  hangul_indexes = numpy.zeros(jamo_indexes.shape[:-1], dtype=numpy.int64)
+  for column, num_jamo in enumerate(num_jamos):
+    hangul_indexes *= num_jamo
+    hangul_indexes += jamo_indexes[..., column]
+  return hangul_indexes
+
+
+def DecomposeHangulArray(code_points,
+                         jamo_romanizations=hangul.JAMO_ROMANIZATIONS):
+  """Batch version of hangul.DecomposeHangul().
+
+  Args:
+    code_points: Array of code points, or a string.
+
+  Returns:
+    Tuple (jamo_indexes, is_hangul). jamo_indexes is an (N, 3) int8 array
+    whose rows are -1 for non-hangul characters, and is_hangul is a boolean
+    mask of hangul characters.
+  """
+  if isinstance(code_points, str):
+    code_points = CodePoints(code_points)
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  hangul_indexes = (numpy.asarray(code_points, dtype=numpy.int64) -
+                    ord(hangul.FIRST_HANGUL_CHARACTER))
+  is_hangul = (hangul_indexes >= 0) & (hangul_indexes < scheme.num_characters)
+  jamo_indexes = DecomposeHangulIndexArray(
+    numpy.where(is_hangul, hangul_indexes, 0), scheme.num_jamos)
+  if max(scheme.num_jamos) <= 128:
+    jamo_indexes = jamo_indexes.astype(numpy.int8)
+  jamo_indexes[~is_hangul] = -1
+  return jamo_indexes, is_hangul
+
+
+def ComposeHangulArray(jamo_indexes,
+                       jamo_romanizations=hangul.JAMO_ROMANIZATIONS,
+                       fill=0):
+  """Batch version of hangul.ComposeHangul().
+
+  Args:
+    jamo_indexes: (N, 3) array of jamo indexes. Rows with a negative index
+        are taken as non-hangul characters.
+    fill: Code point, or array of code points, used for non-hangul rows.
+        Pass the original code points to restore a decomposed string.
+
+  Returns:
+    uint32 array of code points.
+  """
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  jamo_indexes = numpy.asarray(jamo_indexes)
+  is_hangul = (jamo_indexes >= 0).all(axis=-1)
+  code_points = (ComposeHangulIndexArray(jamo_indexes, scheme.num_jamos) +
+                 ord(hangul.FIRST_HANGUL_CHARACTER))
+  return numpy.where(is_hangul, code_points, fill).astype(numpy.uint32)
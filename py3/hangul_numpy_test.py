@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import unittest
+import hangul
+
+try:
+  import numpy
+  import hangul_numpy
+except ImportError:
+  numpy = None
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestHangulNumpy(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testCodePoints(self):
+    self.assertEqual([0xac00, 0x61, 0x1f600],
+                     hangul_numpy.CodePoints('가a\U0001f600').tolist())
+    self.assertEqual('가a\U0001f600', hangul_numpy.StringFromCodePoints(
+      [0xac00, 0x61, 0x1f600]))
+
+  def testDecomposeHangulIndexArray(self):
+    num_jamos = (19, 21, 28)
+    self.assertEqual(
+      [[0, 0, 0], [0, 0, 1], [11, 0, 0], [18, 20, 27]],
+      hangul_numpy.DecomposeHangulIndexArray([0, 1, 6468, 11171],
+                                             num_jamos).tolist())
+    for hangul_index in range(0, 11172, 97):
+      self.assertEqual(
+        list(hangul.DecomposeHangulIndex(hangul_index, num_jamos)),
+        hangul_numpy.DecomposeHangulIndexArray(hangul_index,
+                                               num_jamos).tolist())
+
+  def testComposeHangulIndexArray(self):
+    num_jamos = (19, 21, 28)
+    self.assertEqual(
+      [0, 1, 6468, 11171],
+      hangul_numpy.ComposeHangulIndexArray(
+        [[0, 0, 0], [0, 0, 1], [11, 0, 0], [18, 20, 27]], num_jamos).tolist())
+
+  def testDecomposeHangulArray(self):
+    jamo_indexes, is_hangul = hangul_numpy.DecomposeHangulArray('많a힣ㄱ')
+    self.assertEqual(
+      [[6, 0, 6], [-1, -1, -1], [18, 20, 27], [-1, -1, -1]],
+      jamo_indexes.tolist())
+    self.assertEqual([True, False, True, False], is_hangul.tolist())
+    self.assertEqual(numpy.int8, jamo_indexes.dtype)
+
+    code_points = numpy.arange(0xabff, 0xd7a5)
+    jamo_indexes, is_hangul = hangul_numpy.DecomposeHangulArray(code_points)
+    self.assertEqual(11172, is_hangul.sum())
+    self.assertEqual((0, 0, 0), tuple(jamo_indexes[1]))
+    self.assertEqual((-1, -1, -1), tuple(jamo_indexes[-1]))
+
+  def testComposeHangulArray(self):
+    self.assertEqual('많\x00힣', hangul_numpy.StringFromCodePoints(
+      hangul_numpy.ComposeHangulArray(
+        [[6, 0, 6], [-1, -1, -1], [18, 20, 27]])))
+
+    code_points = hangul_numpy.CodePoints('없는 2PM 가나다')
+    jamo_indexes, _ = hangul_numpy.DecomposeHangulArray(code_points)
+    self.assertEqual('없는 2PM 가나다', hangul_numpy.StringFromCodePoints(
+      hangul_numpy.ComposeHangulArray(jamo_indexes, fill=code_points)))
+
+
+if __name__ == '__main__':
+  unittest.main()
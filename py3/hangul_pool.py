@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Process pool versions of the hangul string functions for many strings.
+
+Small inputs are converted in the calling process. Larger ones are sent to
+worker processes in chunks whose size adapts to how long they take, and the
+results are yielded in input or completion order.
+"""
+
+import concurrent.futures
+import itertools
+import os
+import time
+
+import hangul
+
+
+# Inputs with fewer strings than this are converted without a process pool.
+SERIAL_THRESHOLD = 10000
+
+# Chunk sizes of the process pool adapt to take about _CHUNK_SECONDS each.
+_MIN_CHUNK_SIZE = 64
+_MAX_CHUNK_SIZE = 1 << 16
+_CHUNK_SECONDS = 0.05
+
+
+def _ConvertStrings(function_name, strings, kwargs):
+  """Convert a chunk of strings. Runs in worker processes."""
+  function = getattr(hangul, function_name)
+  start = time.perf_counter()
+  results = [function(unicode_string, **kwargs) for unicode_string in strings]
+  return time.perf_counter() - start, results
+
+
+def _AdaptChunkSize(num_strings, seconds):
+  """Return the chunk size expected to take _CHUNK_SECONDS."""
+  if seconds <= 0:
+    return _MAX_CHUNK_SIZE
+  chunk_size = int(num_strings * _CHUNK_SECONDS / seconds)
+  return max(_MIN_CHUNK_SIZE, min(_MAX_CHUNK_SIZE, chunk_size))
+
+
+def _ConvertMany(function_name, strings, kwargs, processes, ordered,
+                 executor):
+  """Apply a module function to many strings with a process pool.
+
+  Yields:
+    Results in input order if ordered is True, and (index, result) pairs in
+    completion order otherwise.
+  """
+  if processes is None:
+    processes = os.cpu_count() or 1
+  strings = iter(strings)
+  head = list(itertools.islice(strings, SERIAL_THRESHOLD))
+  strings = itertools.chain(head, strings)
+  if len(head) < SERIAL_THRESHOLD or processes <= 1:
+    function = getattr(hangul, function_name)
+    results = (function(unicode_string, **kwargs)
+               for unicode_string in strings)
+    if ordered:
+      yield from results
+    else:
+      yield from enumerate(results)
+    return
+
+  own_executor = executor is None
+  if own_executor:
+    executor = concurrent.futures.ProcessPoolExecutor(processes)
+  try:
+    chunk_size = _MIN_CHUNK_SIZE
+    next_index = 0
+    exhausted = False
+    # Pairs of the index of the first string and the future of a chunk.
+    pending = []
+    while True:
+      while not exhausted and len(pending) < 2 * processes:
+        chunk = list(itertools.islice(strings, chunk_size))
+        if not chunk:
+          exhausted = True
+          break
+        pending.append((next_index, executor.submit(
+          _ConvertStrings, function_name, chunk, kwargs)))
+        next_index += len(chunk)
+      if not pending:
+        break
+      if ordered:
+        start_index, future = pending.pop(0)
+      else:
+        concurrent.futures.wait([future for _, future in pending],
+                                return_when=concurrent.futures.FIRST_COMPLETED)
+        start_index, future = next(
+          (start_index, future) for start_index, future in pending
+          if future.done())
+        pending.remove((start_index, future))
+      seconds, results = future.result()
+      chunk_size = _AdaptChunkSize(len(results), seconds)
+      if ordered:
+        yield from results
+      else:
+        yield from enumerate(results, start_index)
+  finally:
+    if own_executor:
+      executor.shutdown(cancel_futures=True)
+
+
+def RomanizeMany(strings,
+                 jamo_romanizations=hangul.JAMO_ROMANIZATIONS,
+                 prefix='[', postfix=']', processes=None, ordered=True,
+                 executor=None):
+  """hangul.RomanizeHangulString() for many strings on a process pool.
+
+  Inputs shorter than SERIAL_THRESHOLD strings are converted in this
+  process. Otherwise strings are sent to worker processes in chunks whose
+  size adapts to how long they take.
+
+  Args:
+    strings: Iterable of strings, which is read as results are consumed.
+    processes: Number of worker processes, all CPUs by default.
+    ordered: Yield results in input order. Otherwise (index, result) pairs
+        are yielded as soon as they are ready.
+    executor: concurrent.futures.ProcessPoolExecutor to reuse instead of
+        starting a new one.
+
+  Returns:
+    Iterator of results.
+  """
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  return _ConvertMany('RomanizeHangulString', strings,
+                      {'jamo_romanizations': scheme.jamo_romanizations,
+                       'prefix': prefix, 'postfix': postfix},
+                      processes, ordered, executor)
+
+
+def UnromanizeMany(strings,
+                   jamo_romanizations=hangul.JAMO_ROMANIZATIONS,
+                   prefix='[', postfix=']', processes=None, ordered=True,
+                   executor=None):
+  """hangul.UnromanizeHangulString() for many strings. See RomanizeMany()."""
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  return _ConvertMany('UnromanizeHangulString', strings,
+                      {'jamo_romanizations': scheme.jamo_romanizations,
+                       'prefix': prefix, 'postfix': postfix},
+                      processes, ordered, executor)
+
+
+def GetInitialCharacterMany(strings,
+                            jamo_romanizations=hangul.JAMO_ROMANIZATIONS,
+                            initial_jamos=hangul.INITIAL_JAMOS,
+                            processes=None, ordered=True, executor=None):
+  """hangul.GetInitialCharacter() for many strings. See RomanizeMany()."""
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  return _ConvertMany('GetInitialCharacter', strings,
+                      {'jamo_romanizations': scheme.jamo_romanizations,
+                       'initial_jamos': tuple(initial_jamos)},
+                      processes, ordered, executor)
+
+
+def HasFinalConsonantsMany(strings,
+                           jamo_romanizations=hangul.JAMO_ROMANIZATIONS,
+                           processes=None, ordered=True, executor=None):
+  """hangul.HasFinalConsonants() for many strings. See RomanizeMany()."""
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  return _ConvertMany('HasFinalConsonants', strings,
+                      {'jamo_romanizations': scheme.jamo_romanizations},
+                      processes, ordered, executor)
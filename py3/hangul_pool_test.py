@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import unittest
+import hangul
+import hangul_pool
+
+
+class TestHangulPool(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testRomanizeMany(self):
+    self.assertEqual(['[ga]', 'a', ''],
+                     list(hangul_pool.RomanizeMany(['가', 'a', ''])))
+    self.assertEqual([(0, '(ga)'), (1, 'a')],
+                     list(hangul_pool.RomanizeMany(iter(['가', 'a']),
+                                                   prefix='(', postfix=')',
+                                                   ordered=False)))
+
+    strings = ['가나%d' % index
+               for index in range(hangul_pool.SERIAL_THRESHOLD * 2)]
+    romanized = [hangul.RomanizeHangulString(string) for string in strings]
+    self.assertEqual(romanized,
+                     list(hangul_pool.RomanizeMany(strings, processes=2)))
+    self.assertEqual(romanized, [result for _, result in sorted(
+      hangul_pool.RomanizeMany(iter(strings), processes=2, ordered=False))])
+    self.assertEqual(strings,
+                     list(hangul_pool.UnromanizeMany(romanized, processes=2)))
+
+  def testGetInitialCharacterMany(self):
+    strings = ['이순신', 'Michael', '', '김치국'] * hangul_pool.SERIAL_THRESHOLD
+    self.assertEqual([hangul.GetInitialCharacter(string) for string in strings],
+                     list(hangul_pool.GetInitialCharacterMany(strings,
+                                                              processes=2)))
+    self.assertEqual(['ㅇ', None],
+                     list(hangul_pool.GetInitialCharacterMany(['이', ''])))
+
+  def testHasFinalConsonantsMany(self):
+    strings = ['전략가', '수공', '', 'a'] * hangul_pool.SERIAL_THRESHOLD
+    self.assertEqual([hangul.HasFinalConsonants(string) for string in strings],
+                     list(hangul_pool.HasFinalConsonantsMany(strings,
+                                                             processes=2)))
+
+
+if __name__ == '__main__':
+  unittest.main()
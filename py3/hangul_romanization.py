@@ -0,0 +1,256 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Romanization schemes with sound changes across syllables.
+
+Unlike JAMO_ROMANIZATIONS, these schemes romanize each syllable depending on
+its neighbours, so 신라 becomes silla and 같이 becomes gachi. Rules look at a
+final consonant and the initial and medial jamos of the next syllable, and
+are compiled once into a table which is walked in a single pass.
+"""
+
+import hangul
+
+
+class SyllableRomanizer(object):
+  """Romanizer compiled from rules on adjacent syllables.
+
+  Rules are called with compatibility jamos from INITIAL_JAMOS, MEDIAL_JAMOS
+  and FINAL_JAMOS, where an empty final means no final consonant.
+
+  Args:
+    boundary_rule: Function (final, initial, medial) returning a pair
+        (romanized final, romanized initial). final is None at the start of
+        a word, and its romanization is ignored then.
+    medial_romanizations: Romanizations of MEDIAL_JAMOS.
+    word_final_rule: Function final returning its romanization at the end of
+        a word.
+  """
+
+  def __init__(self, boundary_rule, medial_romanizations, word_final_rule):
+    self._boundary_rule = boundary_rule
+    self._medial_romanizations = tuple(medial_romanizations)
+    self._word_final_rule = word_final_rule
+    self._transitions = None
+    self._word_finals = None
+
+  def _Compile(self):
+    """Build the transition table, which is indexed by state and syllable."""
+    num_initials, num_medials, num_finals = hangul.NUM_JAMOS
+    transitions = []
+    # States are final indexes, and num_finals for the start of a word.
+    for state in range(num_finals + 1):
+      final = hangul.FINAL_JAMOS[state] if state < num_finals else None
+      for initial in hangul.INITIAL_JAMOS:
+        for medial, romanized_medial in zip(hangul.MEDIAL_JAMOS,
+                                            self._medial_romanizations):
+          romanized_final, romanized_initial = self._boundary_rule(
+            final, initial, medial)
+          if final is None:
+            romanized_final = ''
+          transitions.append(romanized_final + romanized_initial +
+                             romanized_medial)
+    self._word_finals = tuple(
+      [self._word_final_rule(final) for final in hangul.FINAL_JAMOS] + [''])
+    self._transitions = tuple(transitions)
+
+  def Romanize(self, unicode_string):
+    """Romanize hangul characters and keep the other characters."""
+    if self._transitions is None:
+      self._Compile()
+    transitions = self._transitions
+    word_finals = self._word_finals
+    num_syllables = hangul.NUM_JAMOS[0] * hangul.NUM_JAMOS[1]
+    num_finals = hangul.NUM_JAMOS[2]
+    first_ord = ord(hangul.FIRST_HANGUL_CHARACTER)
+    num_characters = num_syllables * num_finals
+
+    romanized = []
+    state = num_finals
+    for character in unicode_string:
+      hangul_index = ord(character) - first_ord
+      if 0 <= hangul_index < num_characters:
+        syllable, final = divmod(hangul_index, num_finals)
+        romanized.append(transitions[state * num_syllables + syllable])
+        state = final
+      else:
+        if state != num_finals:
+          romanized.append(word_finals[state])
+          state = num_finals
+        romanized.append(character)
+    romanized.append(word_finals[state])
+    return ''.join(romanized)
+
+
+def JamoRomanizer(jamo_romanizations=hangul.JAMO_ROMANIZATIONS):
+  """Return a SyllableRomanizer which romanizes each jamo on its own.
+
+  This gives the same result as RomanizeHangulString() without a prefix and
+  a postfix.
+  """
+  initials, medials, finals = jamo_romanizations
+  initial_indexes = dict((jamo, index)
+                         for index, jamo in enumerate(hangul.INITIAL_JAMOS))
+  final_indexes = dict((jamo, index)
+                       for index, jamo in enumerate(hangul.FINAL_JAMOS))
+
+  def BoundaryRule(final, initial, unused_medial):
+    return (finals[final_indexes.get(final, 0)],
+            initials[initial_indexes[initial]])
+
+  def WordFinalRule(final):
+    return finals[final_indexes[final]]
+
+  return SyllableRomanizer(BoundaryRule, medials, WordFinalRule)
+
+
+# Revised Romanization of Korean.
+
+_RR_INITIALS = dict(zip(hangul.INITIAL_JAMOS, (
+  'g', 'kk', 'n', 'd', 'tt', 'r', 'm', 'b', 'pp', 's',
+  'ss', '', 'j', 'jj', 'ch', 'k', 't', 'p', 'h')))
+
+_RR_MEDIALS = (
+  'a', 'ae', 'ya', 'yae', 'eo', 'e', 'yeo', 'ye', 'o', 'wa',
+  'wae', 'oe', 'yo', 'u', 'wo', 'we', 'wi', 'yu', 'eu', 'ui',
+  'i')
+
+# Sound of a final consonant before another consonant or at the end of word.
+_CODAS = dict(zip(hangul.FINAL_JAMOS, (
+  '', 'k', 'k', 'k', 'n', 'n', 'n', 't', 'l', 'k',
+  'm', 'l', 'l', 'l', 'p', 'l', 'm', 'p', 'p', 't',
+  't', 'ng', 't', 't', 'k', 't', 'p', 't')))
+
+# A final consonant before a vowel splits into the part staying in the
+# syllable and the part moving over to the next one.
+_LIAISONS = {
+  '': ('', 'ㅇ'), 'ㄱ': ('', 'ㄱ'), 'ㄲ': ('', 'ㄲ'), 'ㄳ': ('k', 'ㅅ'),
+  'ㄴ': ('', 'ㄴ'), 'ㄵ': ('n', 'ㅈ'), 'ㄶ': ('', 'ㄴ'), 'ㄷ': ('', 'ㄷ'),
+  'ㄹ': ('', 'ㄹ'), 'ㄺ': ('l', 'ㄱ'), 'ㄻ': ('l', 'ㅁ'), 'ㄼ': ('l', 'ㅂ'),
+  'ㄽ': ('l', 'ㅅ'), 'ㄾ': ('l', 'ㅌ'), 'ㄿ': ('l', 'ㅍ'), 'ㅀ': ('', 'ㄹ'),
+  'ㅁ': ('', 'ㅁ'), 'ㅂ': ('', 'ㅂ'), 'ㅄ': ('p', 'ㅅ'), 'ㅅ': ('', 'ㅅ'),
+  'ㅆ': ('', 'ㅆ'), 'ㅇ': ('ng', 'ㅇ'), 'ㅈ': ('', 'ㅈ'), 'ㅊ': ('', 'ㅊ'),
+  'ㅋ': ('', 'ㅋ'), 'ㅌ': ('', 'ㅌ'), 'ㅍ': ('', 'ㅍ'), 'ㅎ': ('', 'ㅇ')}
+
+# ㄷ and ㅌ moving over to 이 are palatalized.
+_PALATALIZATIONS = {'ㄷ': 'ㅈ', 'ㅌ': 'ㅊ'}
+
+_NASALS = {'k': 'ng', 't': 'n', 'p': 'm'}
+
+# ㅎ makes the following plain consonant aspirated.
+_ASPIRATIONS = {'ㄱ': 'ㅋ', 'ㄷ': 'ㅌ', 'ㅈ': 'ㅊ', 'ㅅ': 'ㅆ'}
+_H_FINALS = {'ㅎ': '', 'ㄶ': 'n', 'ㅀ': 'l'}
+
+
+def _Pronounce(final, initial, medial):
+  """Apply sound changes between a final and the next initial consonant.
+
+  Returns:
+    Pair (coda, initial) of the final's sound and the next initial jamo.
+  """
+  if initial == 'ㅇ':
+    coda, initial = _LIAISONS[final]
+    if medial == 'ㅣ':
+      initial = _PALATALIZATIONS.get(initial, initial)
+    return coda, initial
+  if final in _H_FINALS:
+    if initial in _ASPIRATIONS:
+      return _H_FINALS[final], _ASPIRATIONS[initial]
+    if initial == 'ㄴ':
+      coda = _H_FINALS[final] or 'n'
+      return coda, 'ㄹ' if coda == 'l' else 'ㄴ'
+  coda = _CODAS[final]
+  if initial == 'ㄹ':
+    if coda in ('l', 'n'):
+      return 'l', 'ㄹ'
+    if coda:
+      return _NASALS.get(coda, coda), 'ㄴ'
+  elif initial in ('ㄴ', 'ㅁ'):
+    if coda == 'l' and initial == 'ㄴ':
+      return 'l', 'ㄹ'
+    coda = _NASALS.get(coda, coda)
+  return coda, initial
+
+
+def _RevisedBoundaryRule(final, initial, medial):
+  if final is None:
+    return '', _RR_INITIALS[initial]
+  coda, initial = _Pronounce(final, initial, medial)
+  if initial == 'ㄹ' and coda == 'l':
+    return coda, 'l'
+  return coda, _RR_INITIALS[initial]
+
+
+REVISED_ROMANIZER = SyllableRomanizer(_RevisedBoundaryRule, _RR_MEDIALS,
+                                      _CODAS.__getitem__)
+
+
+# McCune-Reischauer romanization without capitalization and hyphens.
+
+_MR_INITIALS = dict(zip(hangul.INITIAL_JAMOS, (
+  'k', 'kk', 'n', 't', 'tt', 'r', 'm', 'p', 'pp', 's',
+  'ss', '', 'ch', 'tch', "ch'", "k'", "t'", "p'", 'h')))
+
+# Plain consonants are voiced after a vowel or a voiced final.
+_MR_VOICED_INITIALS = {'ㄱ': 'g', 'ㄷ': 'd', 'ㅂ': 'b', 'ㅈ': 'j'}
+_MR_VOICED_CODAS = ('', 'n', 'l', 'm', 'ng')
+
+_MR_MEDIALS = (
+  'a', 'ae', 'ya', 'yae', 'ŏ', 'e', 'yŏ', 'ye', 'o', 'wa',
+  'wae', 'oe', 'yo', 'u', 'wŏ', 'we', 'wi', 'yu', 'ŭ', 'ŭi',
+  'i')
+
+
+def _McCuneReischauerBoundaryRule(final, initial, medial):
+  if final is None:
+    coda = None
+  else:
+    coda, initial = _Pronounce(final, initial, medial)
+  if initial == 'ㄹ' and coda in ('l', 'n'):
+    romanized_initial = 'l'
+  elif initial in _MR_VOICED_INITIALS and coda in _MR_VOICED_CODAS:
+    romanized_initial = _MR_VOICED_INITIALS[initial]
+  elif initial == 'ㅅ' and medial in ('ㅣ', 'ㅟ'):
+    romanized_initial = 'sh'
+  else:
+    romanized_initial = _MR_INITIALS[initial]
+  # An apostrophe tells n + g apart from ng.
+  if coda == 'n' and romanized_initial.startswith('g'):
+    coda = "n'"
+  return coda or '', romanized_initial
+
+
+MCCUNE_REISCHAUER_ROMANIZER = SyllableRomanizer(
+  _McCuneReischauerBoundaryRule, _MR_MEDIALS, _CODAS.__getitem__)
+
+
+_ROMANIZERS = {
+  'jamo': JamoRomanizer(),
+  'revised': REVISED_ROMANIZER,
+  'mccune-reischauer': MCCUNE_REISCHAUER_ROMANIZER,
+}
+
+
+def RegisterRomanizer(name, romanizer):
+  """Register a romanizer, which is any object with a Romanize() method."""
+  _ROMANIZERS[name] = romanizer
+
+
+def GetRomanizer(name):
+  """Return the romanizer registered under name."""
+  try:
+    return _ROMANIZERS[name]
+  except KeyError:
+    raise KeyError('Unknown romanization: %r. Known ones are %s.' %
+                   (name, ', '.join(sorted(_ROMANIZERS))))
+
+
+def RomanizerNames():
+  """Return the sorted names of registered romanizers."""
+  return sorted(_ROMANIZERS)
+
+
+def Romanize(unicode_string, name='revised'):
+  """Romanize a string with the romanizer registered under name."""
+  return GetRomanizer(name).Romanize(unicode_string)
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import unittest
+import hangul
+import hangul_romanization
+
+
+class TestHangulRomanization(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testRevised(self):
+    romanize = hangul_romanization.REVISED_ROMANIZER.Romanize
+    self.assertEqual('silla', romanize('신라'))
+    self.assertEqual('gachi', romanize('같이'))
+    self.assertEqual('haedoji', romanize('해돋이'))
+    self.assertEqual('hangugeo', romanize('한국어'))
+    self.assertEqual('gungmul', romanize('국물'))
+    self.assertEqual('jongno', romanize('종로'))
+    self.assertEqual('baengni', romanize('백리'))
+    self.assertEqual('seollal', romanize('설날'))
+    self.assertEqual('daegwallyeong', romanize('대관령'))
+    self.assertEqual('hyeomnyeok', romanize('협력'))
+    self.assertEqual('imnida', romanize('입니다'))
+    self.assertEqual('joko', romanize('좋고'))
+    self.assertEqual('manta', romanize('많다'))
+    self.assertEqual('joa', romanize('좋아'))
+    self.assertEqual('sireo', romanize('싫어'))
+    self.assertEqual('eopseo', romanize('없어'))
+    self.assertEqual('anja', romanize('앉아'))
+    self.assertEqual('dak', romanize('닭'))
+    self.assertEqual('mukho', romanize('묵호'))
+    self.assertEqual('dokdo', romanize('독도'))
+    self.assertEqual('gimchi', romanize('김치'))
+
+    # Words are separated by anything but hangul.
+    self.assertEqual('seoul-si bak ireum', romanize('서울-시 박 이름'))
+    self.assertEqual('', romanize(''))
+    self.assertEqual('a1', romanize('a1'))
+
+  def testMcCuneReischauer(self):
+    romanize = hangul_romanization.MCCUNE_REISCHAUER_ROMANIZER.Romanize
+    self.assertEqual("han'gugŏ", romanize('한국어'))
+    self.assertEqual('pusan', romanize('부산'))
+    self.assertEqual("kimch'i", romanize('김치'))
+    self.assertEqual("kach'i", romanize('같이'))
+    self.assertEqual('tokto', romanize('독도'))
+    self.assertEqual('sŏllal', romanize('설날'))
+    self.assertEqual('chongno', romanize('종로'))
+    self.assertEqual('shiwŏl', romanize('시월'))
+
+  def testJamoRomanizer(self):
+    romanizer = hangul_romanization.JamoRomanizer()
+    for text in ('한국어', '신라 같이', '없는 2PM', 'ㄱ가'):
+      self.assertEqual(hangul.RomanizeHangulString(text, prefix='',
+                                                   postfix=''),
+                       romanizer.Romanize(text))
+
+  def testRegistry(self):
+    self.assertEqual('silla', hangul_romanization.Romanize('신라'))
+    self.assertEqual('sinra', hangul_romanization.Romanize('신라', 'jamo'))
+    self.assertEqual(['jamo', 'mccune-reischauer', 'revised'],
+                     hangul_romanization.RomanizerNames())
+    self.assertRaises(KeyError, hangul_romanization.Romanize, '신라', 'x')
+
+    class UpperRomanizer(object):
+
+      def Romanize(self, unicode_string):
+        return hangul_romanization.Romanize(unicode_string).upper()
+
+    hangul_romanization.RegisterRomanizer('upper', UpperRomanizer())
+    try:
+      self.assertEqual('SILLA', hangul_romanization.Romanize('신라', 'upper'))
+    finally:
+      del hangul_romanization._ROMANIZERS['upper']
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,436 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Search indexes over lists of hangul strings."""
+
+import array
+import bisect
+import itertools
+
+import hangul
+import hangul_ime
+
+
+def _SortSuffixes(strings, key_length=8):
+  """Return (string ids, offsets) arrays of every suffix in sorted order.
+
+  Suffixes are put in buckets by their first character, then each bucket is
+  sorted by the next key_length characters, and runs which tie are sorted
+  again by the following ones. Only short slices of one bucket are made at a
+  time instead of a copy of every suffix.
+  """
+  string_ids = array.array('L')
+  offsets = array.array('L')
+  buckets = {}
+  for string_id, string in enumerate(strings):
+    for offset, character in enumerate(string):
+      bucket = buckets.get(character)
+      if bucket is None:
+        bucket = buckets[character] = array.array('L')
+      bucket.append(len(offsets))
+      string_ids.append(string_id)
+      offsets.append(offset)
+
+  order = array.array('L')
+  pending = []
+  for character in sorted(buckets):
+    pending.append((len(order), len(order) + len(buckets[character]), 1))
+    order.extend(buckets.pop(character))
+  while pending:
+    start, end, depth = pending.pop()
+    if end - start < 2:
+      continue
+    suffixes = order[start:end]
+    keys = []
+    for suffix in suffixes:
+      offset = offsets[suffix] + depth
+      keys.append(strings[string_ids[suffix]][offset:offset + key_length])
+    ranking = sorted(range(len(keys)), key=keys.__getitem__)
+    order[start:end] = array.array('L', (suffixes[rank] for rank in ranking))
+    # Suffixes with the same full-length key are not sorted yet.
+    run_start = 0
+    for position in range(1, len(ranking) + 1):
+      if (position < len(ranking) and
+          keys[ranking[position]] == keys[ranking[run_start]]):
+        continue
+      if len(keys[ranking[run_start]]) == key_length:
+        pending.append((start + run_start, start + position,
+                        depth + key_length))
+      run_start = position
+
+  return (array.array('L', (string_ids[suffix] for suffix in order)),
+          array.array('L', (offsets[suffix] for suffix in order)))
+
+
+class ChoseongIndex(object):
+  """Initial consonant (choseong) search over a list of strings.
+
+  Each string is indexed by GetInitialCharacters(), so a query like ㄱㅈㅇ
+  matches 김정은 and 강조용. Queries are converted the same way, so hangul
+  syllables in a query stand for their initial consonants.
+  """
+
+  def __init__(self, strings,
+               jamo_romanizations=hangul.JAMO_ROMANIZATIONS,
+               initial_jamos=hangul.INITIAL_JAMOS):
+    """Build the index.
+
+    Args:
+      strings: Iterable of strings such as contact names.
+    """
+    self._scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+    self._initial_jamos = tuple(initial_jamos)
+    self.strings = list(strings)
+    initials = [self._Initials(string) for string in self.strings]
+
+    # Sorted initial strings for prefix search.
+    order = sorted(range(len(initials)), key=initials.__getitem__)
+    self._prefix_keys = [initials[string_id] for string_id in order]
+    self._prefix_ids = array.array('L', order)
+
+    # Suffix array of the initial strings for substring search. A suffix is
+    # initials[string_id][offset:] for the ids and offsets at the same index.
+    self._initials = initials
+    self._suffix_ids, self._suffix_offsets = _SortSuffixes(initials)
+
+  def __len__(self):
+    return len(self.strings)
+
+  def _Initials(self, string):
+    return hangul.GetInitialCharacters(string, self._scheme,
+                                       self._initial_jamos)
+
+  def SearchIndexes(self, query, substring=False):
+    """Return sorted indexes of strings matching the query.
+
+    Args:
+      query: Initial consonants such as ㄱㅈㅇ.
+      substring: Match anywhere in the string instead of at the start.
+    """
+    query = self._Initials(query)
+    if substring and query:
+      start = self._BisectSuffixes(query, False)
+      end = self._BisectSuffixes(query, True)
+      return sorted(set(self._suffix_ids[start:end]))
+    keys = self._prefix_keys
+    start = bisect.bisect_left(keys, query)
+    end = start
+    while end < len(keys) and keys[end].startswith(query):
+      end += 1
+    return sorted(set(self._prefix_ids[start:end]))
+
+  def _BisectSuffixes(self, query, after_matches):
+    """Return the first suffix index at or after those starting with query.
+
+    Only len(query) characters of each suffix are sliced for comparison.
+    """
+    initials = self._initials
+    suffix_ids, suffix_offsets = self._suffix_ids, self._suffix_offsets
+    low, high = 0, len(suffix_ids)
+    while low < high:
+      middle = (low + high) // 2
+      offset = suffix_offsets[middle]
+      head = initials[suffix_ids[middle]][offset:offset + len(query)]
+      if head < query or after_matches and head == query:
+        low = middle + 1
+      else:
+        high = middle
+    return low
+
+  def Search(self, query, substring=False):
+    """Return strings matching the query in their original order."""
+    return [self.strings[string_id]
+            for string_id in self.SearchIndexes(query, substring)]
+
+
+_JAMO_SEQUENCE_TABLES = {}
+
+
+def _JamoSequenceTable(scheme):
+  """Return a dict from hangul characters to their jamo numbers."""
+  table = _JAMO_SEQUENCE_TABLES.get(scheme)
+  if table is None:
+    num_initials, num_medials, _ = scheme.num_jamos
+    table = {}
+    for hangul_index in range(scheme.num_characters):
+      initial, medial, final = hangul.DecomposeHangulIndex(hangul_index,
+                                                           scheme.num_jamos)
+      # Number jamos across the three families so that they never collide.
+      jamos = (initial, num_initials + medial)
+      if final:
+        jamos += (num_initials + num_medials + final,)
+      table[hangul.ChrHangul(hangul_index)] = jamos
+    table = _JAMO_SEQUENCE_TABLES.setdefault(scheme, table)
+  return table
+
+
+def JamoSequence(unicode_string,
+                 jamo_romanizations=hangul.JAMO_ROMANIZATIONS):
+  """Return the jamo sequence of a string as a tuple.
+
+  Hangul characters are replaced by integers standing for their initial,
+  medial and final jamos, omitting an empty final. Other characters are kept
+  as they are.
+  """
+  scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+  get_jamos = _JamoSequenceTable(scheme).get
+  return tuple(itertools.chain.from_iterable(
+    get_jamos(character, character) for character in unicode_string))
+
+
+def _EditDistance(source, target, max_distance=None):
+  """Levenshtein distance between two sequences.
+
+  If max_distance is given, distances larger than it are returned as
+  max_distance + 1, stopping as soon as every cell of a row exceeds it.
+  """
+  if len(source) < len(target):
+    source, target = target, source
+  if max_distance is not None and len(source) - len(target) > max_distance:
+    return max_distance + 1
+  previous_row = list(range(len(target) + 1))
+  for source_index, source_item in enumerate(source, 1):
+    current_row = [source_index]
+    for target_index, target_item in enumerate(target, 1):
+      current_row.append(min(previous_row[target_index] + 1,
+                             current_row[target_index - 1] + 1,
+                             previous_row[target_index - 1] +
+                             (source_item != target_item)))
+    if max_distance is not None and min(current_row) > max_distance:
+      return max_distance + 1
+    previous_row = current_row
+  if max_distance is not None and previous_row[-1] > max_distance:
+    return max_distance + 1
+  return previous_row[-1]
+
+
+def JamoEditDistance(source, target,
+                     jamo_romanizations=hangul.JAMO_ROMANIZATIONS):
+  """Levenshtein distance between the jamo sequences of two strings.
+
+  Unlike a distance between characters, 간 and 감 are 1 apart since only
+  their final consonants differ, and 가 and 각 are 1 apart as well.
+  """
+  return _EditDistance(JamoSequence(source, jamo_romanizations),
+                       JamoSequence(target, jamo_romanizations))
+
+
+class JamoBKTree(object):
+  """BK-tree over terms for typo-tolerant lookup by JamoEditDistance().
+
+  Adding and searching a term compute distances to many nodes, so use
+  JamoDeletionIndex for large vocabularies.
+  """
+
+  def __init__(self, terms=(), jamo_romanizations=hangul.JAMO_ROMANIZATIONS):
+    self._scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+    # Each node is [term, jamo sequence, {distance: child node}].
+    self._root = None
+    self._size = 0
+    for term in terms:
+      self.Add(term)
+
+  def __len__(self):
+    return self._size
+
+  def Add(self, term):
+    """Add a term. Returns False if it was already in the tree."""
+    sequence = JamoSequence(term, self._scheme)
+    if self._root is None:
+      self._root = [term, sequence, {}]
+      self._size += 1
+      return True
+    node = self._root
+    while True:
+      distance = _EditDistance(sequence, node[1])
+      if distance == 0:
+        return False
+      child = node[2].get(distance)
+      if child is None:
+        node[2][distance] = [term, sequence, {}]
+        self._size += 1
+        return True
+      node = child
+
+  def Search(self, query, max_distance=1):
+    """Return (distance, term) pairs within max_distance, nearest first."""
+    if self._root is None:
+      return []
+    sequence = JamoSequence(query, self._scheme)
+    matches = []
+    nodes = [self._root]
+    while nodes:
+      term, node_sequence, children = nodes.pop()
+      # Children are pruned alike for any distance beyond the largest child
+      # distance plus max_distance, so the exact distance is not needed.
+      distance = _EditDistance(sequence, node_sequence,
+                               max(children, default=0) + max_distance)
+      if distance <= max_distance:
+        matches.append((distance, term))
+      # By the triangle inequality only these children can be close enough.
+      for child_distance, child in children.items():
+        if abs(child_distance - distance) <= max_distance:
+          nodes.append(child)
+    matches.sort()
+    return matches
+
+
+class JamoDeletionIndex(object):
+  """Index for typo-tolerant lookup by JamoEditDistance() in many terms.
+
+  Two sequences are within distance k if deleting at most k jamos from each
+  makes them equal, and this still holds for their first prefix_length jamos.
+  So every term is indexed under each sequence made by deleting up to
+  max_distance jamos from its prefix, and a query only looks up its own
+  deletions. Only terms sharing a deletion with the query are compared, with a
+  distance that stops at max_distance, so unlike JamoBKTree a query does not
+  depend on the number of terms. In exchange each term is stored under
+  about C(prefix_length, max_distance) deletions.
+  """
+
+  def __init__(self, terms=(), max_distance=2, prefix_length=7,
+               jamo_romanizations=hangul.JAMO_ROMANIZATIONS):
+    """Build the index.
+
+    Args:
+      terms: Iterable of strings such as dictionary words.
+      max_distance: Largest max_distance of Search().
+      prefix_length: Number of leading jamos of each term to delete from.
+          Longer prefixes make fewer candidates but more deletions.
+      jamo_romanizations: Romanization scheme as in JamoSequence().
+    """
+    self._scheme = hangul.CompileRomanizationScheme(jamo_romanizations)
+    self.max_distance = max_distance
+    self.prefix_length = prefix_length
+    self.terms = []
+    self._sequences = []
+    self._term_ids = {}
+    # Dict from a deletion to the ids of terms having it.
+    self._deletions = {}
+    for term in terms:
+      self.Add(term)
+
+  def __len__(self):
+    return len(self.terms)
+
+  def _Deletions(self, sequence, max_deletions):
+    """Return the set of sequences deleting up to max_deletions jamos."""
+    level = [sequence[:self.prefix_length]]
+    deletions = set(level)
+    for _ in range(max_deletions):
+      next_level = []
+      for variant in level:
+        for index in range(len(variant)):
+          deletion = variant[:index] + variant[index + 1:]
+          if deletion not in deletions:
+            deletions.add(deletion)
+            next_level.append(deletion)
+      level = next_level
+    return deletions
+
+  def Add(self, term):
+    """Add a term. Returns False if it was already in the index."""
+    if term in self._term_ids:
+      return False
+    sequence = JamoSequence(term, self._scheme)
+    term_id = self._term_ids[term] = len(self.terms)
+    self.terms.append(term)
+    self._sequences.append(sequence)
+    for deletion in self._Deletions(sequence, self.max_distance):
+      term_ids = self._deletions.get(deletion)
+      if term_ids is None:
+        self._deletions[deletion] = [term_id]
+      else:
+        term_ids.append(term_id)
+    return True
+
+  def Search(self, query, max_distance=1):
+    """Return (distance, term) pairs within max_distance, nearest first.
+
+    Raises:
+      ValueError: max_distance is larger than the index was built for.
+    """
+    if max_distance > self.max_distance:
+      raise ValueError('max_distance %d is larger than %d of the index' % (
+        max_distance, self.max_distance))
+    sequence = JamoSequence(query, self._scheme)
+    candidates = set()
+    for deletion in self._Deletions(sequence, max_distance):
+      candidates.update(self._deletions.get(deletion, ()))
+    matches = []
+    for term_id in candidates:
+      distance = _EditDistance(sequence, self._sequences[term_id],
+                               max_distance)
+      if distance <= max_distance:
+        matches.append((distance, self.terms[term_id]))
+    matches.sort()
+    return matches
+
+
+class JamoCompletionIndex(object):
+  """As-you-type completion of terms with an incomplete last syllable.
+
+  Terms and queries are compared by their hangul_ime.Keystrokes(), so a
+  query matches whatever its last syllable can still become while typing:
+  가 matches 각, 감자 and 간장, 고 matches 과자, and the final consonant of
+  감 may become the next initial as in 가마. Other characters are compared in
+  lower case.
+
+  Each node of the jamo trie keeps the ids of its best max_results terms, so
+  a query takes time proportional to its length only.
+  """
+
+  def __init__(self, terms, scores=None, max_results=10):
+    """Build the index.
+
+    Args:
+      terms: Iterable of strings such as search keywords.
+      scores: Optional numbers for each term. Higher scores come first, and
+          terms with the same score keep their order.
+      max_results: Largest number of completions returned for a query.
+    """
+    self.terms = list(terms)
+    self.max_results = max_results
+    if scores is None:
+      order = range(len(self.terms))
+    else:
+      scores = list(scores)
+      order = sorted(range(len(self.terms)),
+                     key=lambda term_id: -scores[term_id])
+    # Each node is [{jamo: child node}, term ids in order].
+    self._root = [{}, array.array('L')]
+    for term_id in order:
+      node = self._root
+      self._AddId(node, term_id)
+      for jamo in self._Keystrokes(self.terms[term_id]):
+        children = node[0]
+        node = children.get(jamo)
+        if node is None:
+          node = children[jamo] = [{}, array.array('L')]
+        self._AddId(node, term_id)
+
+  def __len__(self):
+    return len(self.terms)
+
+  def _AddId(self, node, term_id):
+    if len(node[1]) < self.max_results:
+      node[1].append(term_id)
+
+  @staticmethod
+  def _Keystrokes(string):
+    return hangul_ime.Keystrokes(string.lower())
+
+  def CompleteIndexes(self, query, max_results=None):
+    """Return ids of the best terms starting with the query, best first."""
+    node = self._root
+    for jamo in self._Keystrokes(query):
+      node = node[0].get(jamo)
+      if node is None:
+        return []
+    return node[1][:max_results].tolist()
+
+  def Complete(self, query, max_results=None):
+    """Return the best terms starting with the query, best first."""
+    return [self.terms[term_id]
+            for term_id in self.CompleteIndexes(query, max_results)]
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import unittest
+import hangul
+import hangul_search
+
+
+class TestHangulSearch(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testChoseongIndex(self):
+    index = hangul_search.ChoseongIndex(
+      ['김정은', '강조용', '이순신', 'Michael', '김치국', '고정', '정은'])
+    self.assertEqual(7, len(index))
+    self.assertEqual(['김정은', '강조용'], index.Search('ㄱㅈㅇ'))
+    self.assertEqual(['김정은', '강조용', '김치국', '고정'], index.Search('ㄱ'))
+    self.assertEqual(['김정은', '강조용', '고정'], index.Search('김ㅈ'))
+    self.assertEqual(['Michael'], index.Search('mi'))
+    self.assertEqual([], index.Search('ㅎ'))
+    self.assertEqual(7, len(index.Search('')))
+    self.assertEqual(['김정은', '강조용', '고정', '정은'],
+                     index.Search('ㅈ', substring=True))
+    self.assertEqual([0, 1, 6], index.SearchIndexes('ㅈㅇ', substring=True))
+    self.assertEqual(['정은'], index.Search('ㅈㅇ'))
+    self.assertEqual(['이순신'], index.Search('ㅅㅅ', substring=True))
+    self.assertEqual([], index.Search('ㅅㅅ'))
+
+    strings = ['가나다가나', '나나', '', 'ab', 'aab', '다가', '나나나', 'ba']
+    index = hangul_search.ChoseongIndex(strings)
+    initials = [hangul.GetInitialCharacters(string) for string in strings]
+    for query in ('ㄱ', 'ㄴ', 'ㄴㄴ', 'ㄴㄴㄴ', 'ㄷㄱㄴ', 'ㄱㄴ', 'A', 'AB', 'BA',
+                  'ㄹ'):
+      self.assertEqual([string_id for string_id, initial in enumerate(initials)
+                        if query in initial],
+                       index.SearchIndexes(query, substring=True))
+
+  def testJamoSequence(self):
+    self.assertEqual((0, 19, 40 + 4, 'a'), hangul_search.JamoSequence('간a'))
+    self.assertEqual((11, 19), hangul_search.JamoSequence('아'))
+    self.assertEqual((), hangul_search.JamoSequence(''))
+
+  def testJamoEditDistance(self):
+    self.assertEqual(0, hangul_search.JamoEditDistance('한국', '한국'))
+    self.assertEqual(1, hangul_search.JamoEditDistance('간', '감'))
+    self.assertEqual(1, hangul_search.JamoEditDistance('가', '각'))
+    self.assertEqual(1, hangul_search.JamoEditDistance('한국', '헌국'))
+    self.assertEqual(2, hangul_search.JamoEditDistance('간', '곰'))
+    self.assertEqual(3, hangul_search.JamoEditDistance('', '간'))
+    self.assertEqual(1, hangul_search.JamoEditDistance('abc', 'abd'))
+    self.assertEqual(2, hangul_search.JamoEditDistance('a가', '가a'))
+    self.assertEqual(2, hangul_search._EditDistance('abcd', 'xyzd', 1))
+    self.assertEqual(2, hangul_search._EditDistance('abcd', 'a', 1))
+    self.assertEqual(1, hangul_search._EditDistance('abcd', 'abd', 1))
+
+  def testJamoBKTree(self):
+    tree = hangul_search.JamoBKTree(
+      ['한국', '한국어', '학교', '항국', '간장', '감자', '강장', 'hangul'])
+    self.assertEqual(8, len(tree))
+    self.assertFalse(tree.Add('한국'))
+    self.assertEqual(8, len(tree))
+    self.assertEqual([(0, '한국'), (1, '항국')], tree.Search('한국'))
+    self.assertEqual([(1, '한국'), (2, '학교'), (2, '항국')],
+                     tree.Search('한구', max_distance=2))
+    self.assertEqual([(1, '간장'), (1, '감자'), (1, '강장')],
+                     tree.Search('감장'))
+    self.assertEqual([(1, 'hangul')], tree.Search('hangel'))
+    self.assertEqual([], hangul_search.JamoBKTree().Search('한국'))
+
+    terms = ['가', '각', '간', '갇', '갈', '감', '갑', '강', '개', '거', '고']
+    tree = hangul_search.JamoBKTree(terms)
+    for query in terms + ['갂', '겅', 'a']:
+      for max_distance in range(4):
+        self.assertEqual(
+          sorted((hangul_search.JamoEditDistance(query, term), term)
+                 for term in terms
+                 if hangul_search.JamoEditDistance(query, term) <=
+                 max_distance),
+          tree.Search(query, max_distance))
+
+  def testJamoDeletionIndex(self):
+    index = hangul_search.JamoDeletionIndex(
+      ['한국', '한국어', '학교', '항국', '간장', '감자', '강장', 'hangul'])
+    self.assertEqual(8, len(index))
+    self.assertFalse(index.Add('한국'))
+    self.assertEqual(8, len(index))
+    self.assertEqual([(0, '한국'), (1, '항국')], index.Search('한국'))
+    self.assertEqual([(1, '한국'), (2, '학교'), (2, '항국')],
+                     index.Search('한구', max_distance=2))
+    self.assertEqual([(1, '간장'), (1, '감자'), (1, '강장')],
+                     index.Search('감장'))
+    self.assertEqual([(1, 'hangul')], index.Search('hangel'))
+    self.assertEqual([], hangul_search.JamoDeletionIndex().Search('한국'))
+    self.assertRaises(ValueError, index.Search, '한국', 3)
+
+    terms = ['가', '각', '간', '갈', '강', '거', '고', '가나다라', '가나다라마',
+             '나가다라마바', '가나다라마바사', '가나다라마바사아', 'a', 'ab']
+    index = hangul_search.JamoDeletionIndex(terms, max_distance=3,
+                                            prefix_length=4)
+    for query in terms + ['', '갂', '겅', '가나다마바사아', 'b']:
+      for max_distance in range(4):
+        self.assertEqual(
+          sorted((hangul_search.JamoEditDistance(query, term), term)
+                 for term in terms
+                 if hangul_search.JamoEditDistance(query, term) <=
+                 max_distance),
+          index.Search(query, max_distance))
+
+  def testJamoCompletionIndex(self):
+    index = hangul_search.JamoCompletionIndex(
+      ['감자', '가마', '간장', '과자', '각도', '한국', '감', 'Hangul', '닭갈비',
+       '달걀'], scores=[5, 3, 4, 9, 1, 8, 2, 1, 3, 6], max_results=3)
+    self.assertEqual(10, len(index))
+    self.assertEqual(['과자', '한국', '달걀'], index.Complete(''))
+    self.assertEqual(['감자', '간장', '가마'], index.Complete('가'))
+    self.assertEqual(['감자', '가마', '감'], index.Complete('감'))
+    self.assertEqual(['감자'], index.Complete('감ㅈ'))
+    self.assertEqual(['과자'], index.Complete('고'))
+    self.assertEqual(['Hangul'], index.Complete('ha'))
+    self.assertEqual(['달걀', '닭갈비'], index.Complete('닭'))
+    self.assertEqual(['달걀', '닭갈비'], index.Complete('달ㄱ'))
+    self.assertEqual(['감자'], index.Complete('가', max_results=1))
+    self.assertEqual([0], index.CompleteIndexes('감ㅈ'))
+    self.assertEqual([], index.Complete('갑'))
+
+    # Without scores terms keep their order.
+    index = hangul_search.JamoCompletionIndex(['각', '가', '간'])
+    self.assertEqual(['각', '가', '간'], index.Complete('ㄱ'))
+
+if __name__ == '__main__':
+  unittest.main()
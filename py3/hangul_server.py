@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Asyncio server which batches hangul conversions, and its client.
+
+The protocol is one JSON object per line. A request looks like
+
+  {"id": 1, "op": "romanize", "text": "가나", "prefix": "[", "postfix": "]"}
+
+and gets a response {"id": 1, "result": "[ga][na]"}, or {"id": 1, "error":
+"..."} on failure. Responses may come in any order. Operations are romanize
+and unromanize with optional prefix and postfix, initial, and josa with
+no_cons and cons as in AppendHangulPostfix().
+
+Run a server with
+
+  python3 hangul_server.py --unix /tmp/hangul.sock
+  python3 hangul_server.py --port 8765
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+
+import hangul
+
+OPERATIONS = ('romanize', 'unromanize', 'initial', 'josa')
+
+# Requests larger than this are rejected by the line reader.
+LINE_LIMIT = 64 << 20
+
+_OPTION_DEFAULTS = {
+  'romanize': {'prefix': '[', 'postfix': ']'},
+  'unromanize': {'prefix': '[', 'postfix': ']'},
+  'initial': {},
+  'josa': {'no_cons': '', 'cons': ''},
+}
+
+# Texts are joined with this to convert them in a single call.
+_SEPARATOR = '\0'
+
+
+def ConvertBatch(operation, texts, options):
+  """Convert many texts with the same operation and options at once."""
+  if operation in ('romanize', 'unromanize'):
+    if operation == 'romanize':
+      convert = hangul.RomanizeHangulString
+    else:
+      convert = hangul.UnromanizeHangulString
+    if (_SEPARATOR in options['prefix'] or _SEPARATOR in options['postfix'] or
+        any(_SEPARATOR in text for text in texts)):
+      return [convert(text, **options) for text in texts]
+    # Spans never contain the separator, so it splits the result back.
+    return convert(_SEPARATOR.join(texts), **options).split(_SEPARATOR)
+  if operation == 'initial':
+    return [hangul.GetInitialCharacter(text) for text in texts]
+  return [hangul.AppendHangulPostfix(text, options['no_cons'],
+                                     options['cons']) for text in texts]
+
+
+def _ParseRequest(request):
+  """Return (operation, text, options) of a request, or raise ValueError."""
+  operation = request.get('op')
+  if operation not in OPERATIONS:
+    raise ValueError('Unknown op: %r' % (operation,))
+  text = request.get('text')
+  if not isinstance(text, str):
+    raise ValueError('text must be a string')
+  options = dict(_OPTION_DEFAULTS[operation])
+  for name in options:
+    value = request.get(name, options[name])
+    if not isinstance(value, str):
+      raise ValueError('%s must be a string' % name)
+    options[name] = value
+  return operation, text, options
+
+
+class HangulServer(object):
+  """Server which converts concurrent requests in batches.
+
+  After the first request of a batch arrives, requests arriving within
+  batch_delay seconds are grouped by operation and options and converted by
+  a single ConvertBatch() call per group.
+  """
+
+  def __init__(self, batch_delay=0.001, max_batch_size=4096):
+    self.batch_delay = batch_delay
+    self.max_batch_size = max_batch_size
+    self.num_batches = 0
+    self.num_requests = 0
+    self._queue = None
+    self._batcher = None
+    self._server = None
+
+  async def Start(self, host='127.0.0.1', port=0, path=None):
+    """Start listening on a Unix socket at path, or on host and port.
+
+    Returns:
+      The asyncio server, whose sockets tell the port if it was 0.
+    """
+    self._queue = asyncio.Queue()
+    self._batcher = asyncio.ensure_future(self._Batch())
+    if path is not None:
+      self._server = await asyncio.start_unix_server(
+        self._HandleConnection, path, limit=LINE_LIMIT)
+    else:
+      self._server = await asyncio.start_server(
+        self._HandleConnection, host, port, limit=LINE_LIMIT)
+    return self._server
+
+  async def Close(self):
+    """Stop listening and stop converting."""
+    self._server.close()
+    await self._server.wait_closed()
+    self._batcher.cancel()
+    try:
+      await self._batcher
+    except asyncio.CancelledError:
+      pass
+
+  async def _HandleConnection(self, reader, writer):
+    responses = set()
+    try:
+      while True:
+        line = await reader.readline()
+        if not line:
+          break
+        response = asyncio.ensure_future(self._Respond(line, writer))
+        responses.add(response)
+        response.add_done_callback(responses.discard)
+      if responses:
+        await asyncio.wait(responses)
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+      pass
+    finally:
+      for response in responses:
+        response.cancel()
+      writer.close()
+
+  async def _Respond(self, line, writer):
+    request_id = None
+    try:
+      request = json.loads(line)
+      if not isinstance(request, dict):
+        raise ValueError('request must be an object')
+      request_id = request.get('id')
+      operation, text, options = _ParseRequest(request)
+      future = asyncio.get_running_loop().create_future()
+      self._queue.put_nowait((operation, text, options, future))
+      response = {'id': request_id, 'result': await future}
+    except ValueError as error:
+      response = {'id': request_id, 'error': str(error)}
+    writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') +
+                 b'\n')
+    await writer.drain()
+
+  async def _Batch(self):
+    while True:
+      batch = [await self._queue.get()]
+      if self.batch_delay:
+        await asyncio.sleep(self.batch_delay)
+      while len(batch) < self.max_batch_size and not self._queue.empty():
+        batch.append(self._queue.get_nowait())
+      self.num_batches += 1
+      self.num_requests += len(batch)
+
+      groups = {}
+      for request in batch:
+        operation, _, options, _ = request
+        key = (operation, tuple(sorted(options.items())))
+        groups.setdefault(key, []).append(request)
+      for (operation, options), requests in groups.items():
+        try:
+          results = ConvertBatch(operation,
+                                 [text for _, text, _, _ in requests],
+                                 dict(options))
+        except Exception as error:
+          for _, _, _, future in requests:
+            if not future.done():
+              future.set_exception(ValueError(str(error)))
+          continue
+        for (_, _, _, future), result in zip(requests, results):
+          if not future.done():
+            future.set_result(result)
+
+
+class HangulClient(object):
+  """Client of HangulServer which can send many requests concurrently."""
+
+  def __init__(self, reader, writer):
+    self._reader = reader
+    self._writer = writer
+    self._ids = itertools.count()
+    self._futures = {}
+    self._receiver = asyncio.ensure_future(self._Receive())
+
+  @classmethod
+  async def Connect(cls, host='127.0.0.1', port=None, path=None):
+    """Connect to a server on a Unix socket at path, or on host and port."""
+    if path is not None:
+      reader, writer = await asyncio.open_unix_connection(path,
+                                                          limit=LINE_LIMIT)
+    else:
+      reader, writer = await asyncio.open_connection(host, port,
+                                                     limit=LINE_LIMIT)
+    return cls(reader, writer)
+
+  async def Close(self):
+    self._writer.close()
+    self._receiver.cancel()
+    try:
+      await self._receiver
+    except asyncio.CancelledError:
+      pass
+
+  async def _Receive(self):
+    try:
+      while True:
+        line = await self._reader.readline()
+        if not line:
+          break
+        response = json.loads(line)
+        future = self._futures.pop(response.get('id'), None)
+        if future is None or future.done():
+          continue
+        if 'error' in response:
+          future.set_exception(ValueError(response['error']))
+        else:
+          future.set_result(response['result'])
+    finally:
+      for future in self._futures.values():
+        if not future.done():
+          future.set_exception(ConnectionError('Connection closed'))
+      self._futures.clear()
+
+  async def Call(self, operation, text, **options):
+    """Send a request and return its result."""
+    request_id = next(self._ids)
+    future = asyncio.get_running_loop().create_future()
+    self._futures[request_id] = future
+    request = dict(options, id=request_id, op=operation, text=text)
+    self._writer.write(json.dumps(request, ensure_ascii=False).encode('utf-8') +
+                       b'\n')
+    await self._writer.drain()
+    return await future
+
+  async def Romanize(self, text, prefix='[', postfix=']'):
+    return await self.Call('romanize', text, prefix=prefix, postfix=postfix)
+
+  async def Unromanize(self, text, prefix='[', postfix=']'):
+    return await self.Call('unromanize', text, prefix=prefix, postfix=postfix)
+
+  async def GetInitialCharacter(self, text):
+    return await self.Call('initial', text)
+
+  async def AppendHangulPostfix(self, text, no_cons, cons):
+    return await self.Call('josa', text, no_cons=no_cons, cons=cons)
+
+
+async def _Serve(args):
+  server = HangulServer(batch_delay=args.batch_delay)
+  asyncio_server = await server.Start(args.host, args.port, args.unix)
+  async with asyncio_server:
+    await asyncio_server.serve_forever()
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--unix', help='path of a Unix socket to listen on')
+  parser.add_argument('--host', default='127.0.0.1')
+  parser.add_argument('--port', type=int, default=0)
+  parser.add_argument('--batch-delay', type=float, default=0.001,
+                      help='seconds to wait for more requests in a batch')
+  args = parser.parse_args(argv)
+  if args.unix is None and not args.port:
+    parser.error('either --unix or --port is required')
+  try:
+    asyncio.run(_Serve(args))
+  except KeyboardInterrupt:
+    pass
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
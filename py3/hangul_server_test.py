@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import hangul_server
+
+
+class TestHangulServer(unittest.IsolatedAsyncioTestCase):
+  """Return value of each test is on the left side."""
+
+  def testConvertBatch(self):
+    options = {'prefix': '[', 'postfix': ']'}
+    self.assertEqual(['[ga]', 'a[na]', ''], hangul_server.ConvertBatch(
+      'romanize', ['가', 'a나', ''], options))
+    self.assertEqual(['가', '[g', 'a]'], hangul_server.ConvertBatch(
+      'unromanize', ['[ga]', '[g', 'a]'], options))
+    self.assertEqual(['[ga]\0', '[na]'], hangul_server.ConvertBatch(
+      'romanize', ['가\0', '나'], options))
+    self.assertEqual(['ㅇ', 'M', None], hangul_server.ConvertBatch(
+      'initial', ['이순신', 'Michael', ''], {}))
+    self.assertEqual(['수공을', '전략가를'], hangul_server.ConvertBatch(
+      'josa', ['수공', '전략가'], {'no_cons': '를', 'cons': '을'}))
+
+  async def testServer(self):
+    server = hangul_server.HangulServer(batch_delay=0.01)
+    asyncio_server = await server.Start()
+    port = asyncio_server.sockets[0].getsockname()[1]
+    client = await hangul_server.HangulClient.Connect(port=port)
+    try:
+      self.assertEqual('[ga][na]', await client.Romanize('가나'))
+      self.assertEqual('(ga)', await client.Romanize('가', '(', ')'))
+      self.assertEqual('가나', await client.Unromanize('[ga][na]'))
+      self.assertEqual('ㄱ', await client.GetInitialCharacter('김치'))
+      self.assertEqual('밥이다', await client.AppendHangulPostfix('밥', '다',
+                                                                '이다'))
+      with self.assertRaises(ValueError):
+        await client.Call('unknown', '가')
+
+      num_batches = server.num_batches
+      texts = ['가나다%d' % index for index in range(100)]
+      results = await asyncio.gather(*[client.Romanize(text)
+                                       for text in texts])
+      self.assertEqual(['[ga][na][da]%d' % index for index in range(100)],
+                       results)
+      self.assertLess(server.num_batches - num_batches, 10)
+    finally:
+      await client.Close()
+      await server.Close()
+
+  async def testUnixServer(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, 'hangul.sock')
+      server = hangul_server.HangulServer()
+      await server.Start(path=path)
+      try:
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b'{"id": 7, "op": "initial", "text": "\\uc774"}\n'
+                     b'not json\n')
+        responses = [json.loads(await reader.readline()) for _ in range(2)]
+        responses.sort(key=lambda response: str(response['id']))
+        self.assertEqual({'id': 7, 'result': 'ㅇ'}, responses[0])
+        self.assertEqual(None, responses[1]['id'])
+        self.assertIn('error', responses[1])
+        writer.close()
+      finally:
+        await server.Close()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -2,7 +2,15 @@
 # -*- coding: utf-8 -*-
 # Copyright (C) 2012 by Jaehyun Yeom
 
+import io
+import json
+import os
+import struct
+import sys
+import tempfile
+import unicodedata
 import unittest
+from unittest import mock
 import hangul
 
 
@@ -23,6 +31,81 @@ class TestHangul(unittest.TestCase):
     self.assertEqual('아', hangul.ChrHangul(6468))
     self.assertEqual('힣', hangul.ChrHangul(11171))
 
+  def testCompileRomanizationScheme(self):
+    jamo = hangul.JAMO_ROMANIZATIONS
+    scheme = hangul.CompileRomanizationScheme(jamo)
+    self.assertIs(scheme, hangul.CompileRomanizationScheme())
+    self.assertIs(scheme, hangul.CompileRomanizationScheme(scheme))
+    self.assertIs(scheme, hangul.CompileRomanizationScheme(
+      [list(jamos) for jamos in jamo]))
+    # Lists find the cached scheme without building a new one.
+    with mock.patch.object(hangul.RomanizationScheme, '__init__',
+                           side_effect=AssertionError('scheme rebuilt')):
+      self.assertIs(scheme, hangul.CompileRomanizationScheme(
+        [list(jamos) for jamos in jamo]))
+    self.assertEqual(hash(scheme), hash(hangul.RomanizationScheme(jamo)))
+    self.assertEqual(scheme, hangul.RomanizationScheme(jamo))
+    self.assertEqual((19, 21, 28), scheme.num_jamos)
+    self.assertEqual(11172, len(scheme.romanizations))
+    self.assertEqual('manh', scheme.romanizations[hangul.OrdHangul('많')])
+    self.assertEqual('<hih>',
+                     scheme.TranslationTable('<', '>')[ord('힣')])
+    self.assertEqual((6, 0, 6), hangul.DecomposeHangul('많', scheme))
+
+  def testSaveRomanizationScheme(self):
+    jamo = tuple(tuple(jamos) for jamos in hangul.JAMO_ROMANIZATIONS)
+    jamo = (jamo[0], jamo[1], jamo[2][:-1] + ('hh',))
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, 'scheme.bin')
+      hangul.SaveRomanizationScheme(path, jamo)
+      loaded = hangul.LoadRomanizationScheme(path)
+      self.addCleanup(loaded.Close)
+      compiled = hangul.CompileRomanizationScheme(jamo)
+      self.assertIsNot(compiled, loaded)
+      self.assertEqual(compiled, loaded)
+      self.assertEqual(list(compiled.romanizations),
+                       list(loaded.romanizations))
+      self.assertEqual(bytes(compiled.final_consonant_bits),
+                       bytes(loaded.final_consonant_bits))
+      self.assertEqual(dict(compiled.UnromanizationTable()),
+                       dict(loaded.UnromanizationTable()))
+      self.assertEqual('[ga][hihh]a', hangul.RomanizeHangulString('가힣a',
+                                                                  loaded))
+      # Only the characters seen so far are in the translation table.
+      self.assertEqual(3, len(loaded.TranslationTable()))
+      self.assertEqual(
+        hangul.RomanizeHangulStringWithOffsets('가a힣 각', compiled),
+        hangul.RomanizeHangulStringWithOffsets('가a힣 각', loaded))
+      self.assertEqual('가힣[x]', hangul.UnromanizeHangulString('[ga][hihh][x]',
+                                                              loaded))
+      self.assertEqual(None, hangul.UnromanizeHangul('x', loaded))
+      self.assertEqual(True, hangul.HasFinalConsonants('앉', loaded))
+
+      self.assertIs(compiled, hangul.CompileRomanizationScheme(jamo))
+      # Found characters are cached.
+      self.assertEqual('힣', loaded.UnromanizationTable()['hihh'])
+      self.assertIs(loaded.UnromanizationTable()['hihh'],
+                    loaded.UnromanizationTable()['hihh'])
+
+      registered = hangul.LoadRomanizationScheme(path, register=True)
+      self.assertIs(registered, hangul.CompileRomanizationScheme(jamo))
+      self.assertEqual('힣', hangul.UnromanizeHangul('hihh', jamo))
+      # Closing unmaps the file and unregisters the scheme.
+      registered.Close()
+      self.assertIsNot(registered, hangul.CompileRomanizationScheme(jamo))
+      loaded.Close()
+
+      with open(path, 'wb') as scheme_file:
+        scheme_file.write(b'not a scheme')
+      self.assertRaises(ValueError, hangul.LoadRomanizationScheme, path)
+      header = json.dumps({'jamo_romanizations': jamo,
+                           'byteorder': sys.byteorder}).encode('utf-8')
+      with open(path, 'wb') as scheme_file:
+        scheme_file.write(hangul._SCHEME_FILE_MAGIC)
+        scheme_file.write(struct.pack('<Q', len(header)))
+        scheme_file.write(header)
+      self.assertRaises(KeyError, hangul.LoadRomanizationScheme, path)
+
   def testDecomposeHangul(self):
     jamo = hangul.JAMO_ROMANIZATIONS
     self.assertEqual((0, 0, 0), hangul.DecomposeHangul('가', jamo))
@@ -74,6 +157,20 @@ class TestHangul(unittest.TestCase):
     self.assertEqual(None, hangul.UnromanizeHangul('', jamo))
     self.assertEqual(None, hangul.UnromanizeHangul('g', jamo))
     self.assertEqual(None, hangul.UnromanizeHangul('hihh', jamo))
+    self.assertEqual(None, hangul.UnromanizeHangul('[ga]', jamo))
+
+  def testUnromanizationTable(self):
+    scheme = hangul.CompileRomanizationScheme()
+    table = scheme.UnromanizationTable()
+    self.assertEqual(11172, len(table))
+    for hangul_index in range(scheme.num_characters):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(character, table[scheme.romanizations[hangul_index]])
+
+    # Greedy matching takes 'gg' even if 'g' + 'ga' would have worked.
+    jamo = (('g', 'gg'), ('ga',), ('',))
+    scheme = hangul.CompileRomanizationScheme(jamo)
+    self.assertEqual({'ggga': '각'}, scheme.UnromanizationTable())
 
   def testRomanizeHangulString(self):
     self.assertEqual('[ga][na][da]', hangul.RomanizeHangulString('가나다'))
@@ -82,6 +179,56 @@ class TestHangul(unittest.TestCase):
       '(san)(do)', hangul.RomanizeHangulString('산도', prefix='(', postfix=')'))
     self.assertEqual(
       'sando', hangul.RomanizeHangulString('산도', prefix='', postfix=''))
+    self.assertEqual('a[ga]1 ㄱ', hangul.RomanizeHangulString('a가1 ㄱ'))
+    self.assertEqual('', hangul.RomanizeHangulString(''))
+
+    # Hangul characters romanized to an empty string are kept.
+    jamo = (('', 'g'), ('',), ('',))
+    self.assertEqual('가[g]', hangul.RomanizeHangulString('가각', jamo))
+    self.assertEqual('개', hangul.RomanizeHangulString('개', jamo))
+
+  def testRomanizeHangulStringWithOffsets(self):
+    romanized, offsets = hangul.RomanizeHangulStringWithOffsets('가a없')
+    self.assertEqual('[ga]a[eobs]', romanized)
+    self.assertEqual([0, 4, 5, 11], list(offsets))
+    romanized, offsets = hangul.RomanizeHangulStringWithOffsets('')
+    self.assertEqual(('', [0]), (romanized, list(offsets)))
+
+  def testRomanizedText(self):
+    text = hangul.RomanizedText('가a나다')
+    self.assertEqual('[ga]a[na][da]', text.romanized)
+    self.assertEqual(5, text.OutputOffset(2))
+    self.assertEqual(2, text.SourceOffset(6))
+    self.assertEqual(4, text.SourceOffset(13))
+    self.assertEqual((1, 3), text.SourceSpan(4, 6))
+    self.assertEqual((2, 2), text.SourceSpan(5, 5))
+
+    self.assertEqual((4, 5, '[han][gug]'), text.Edit(1, 2, '한국'))
+    self.assertEqual('가한국나다', text.source)
+    self.assertEqual('[ga][han][gug][na][da]', text.romanized)
+    for start, end, replacement in ((0, 0, 'x'), (3, 6, ''), (1, 3, '어b'),
+                                    (3, 3, '가나')):
+      text.Edit(start, end, replacement)
+      romanized, offsets = hangul.RomanizeHangulStringWithOffsets(text.source)
+      self.assertEqual(romanized, text.romanized)
+      self.assertEqual(offsets, text.offsets)
+
+    # Edits across offset blocks.
+    source = '가a나' * 5000
+    text = hangul.RomanizedText(source)
+    for start, end, replacement in ((4095, 4097, '다'), (0, 10000, ''),
+                                    (4096, 4096, 'bc'), (5000, 5001, 'd'),
+                                    (0, len(text.source), '라')):
+      text.Edit(start, end, replacement)
+      source = source[:start] + replacement + source[end:]
+      self.assertEqual(source, text.source)
+      romanized, offsets = hangul.RomanizeHangulStringWithOffsets(source)
+      self.assertEqual(romanized, text.romanized)
+      self.assertEqual(offsets, text.offsets)
+      for source_offset in range(0, len(source), 997):
+        output_offset = text.OutputOffset(source_offset)
+        self.assertEqual(offsets[source_offset], output_offset)
+        self.assertEqual(source_offset, text.SourceOffset(output_offset))
 
   def testUnromanizeHangulString(self):
     self.assertEqual('가나다', hangul.UnromanizeHangulString('[ga][na][da]'))
@@ -89,6 +236,167 @@ class TestHangul(unittest.TestCase):
     self.assertEqual('산도', hangul.UnromanizeHangulString('(san)(do)',
                                                            prefix='(',
                                                            postfix=')'))
+    self.assertEqual('a가1 [x]', hangul.UnromanizeHangulString('a[ga]1 [x]'))
+    self.assertEqual('[가', hangul.UnromanizeHangulString('[[ga]'))
+    self.assertEqual('[gx]가', hangul.UnromanizeHangulString('[gx][ga]'))
+    self.assertEqual('ga]가', hangul.UnromanizeHangulString('ga][ga]'))
+    self.assertEqual('[ga', hangul.UnromanizeHangulString('[ga'))
+    self.assertEqual('산도', hangul.UnromanizeHangulString('<<san>><<do>>',
+                                                           prefix='<<',
+                                                           postfix='>>'))
+    # A span starts from the last prefix before its postfix.
+    self.assertEqual('<가', hangul.UnromanizeHangulString('<<<ga>>',
+                                                          prefix='<<',
+                                                          postfix='>>'))
+    self.assertEqual('<<가', hangul.UnromanizeHangulString('<<<<ga>>',
+                                                           prefix='<<',
+                                                           postfix='>>'))
+    self.assertEqual('가', hangul.UnromanizeHangulString('|ga|', prefix='|',
+                                                         postfix='|'))
+    self.assertEqual('[ga]', hangul.UnromanizeHangulString('[ga]', prefix='',
+                                                           postfix=''))
+
+  def testRomanizedHangulSegmenter(self):
+    segmenter = hangul.RomanizedHangulSegmenter()
+    self.assertEqual([('ga', '가'), ('ga', '가')], segmenter.Segment('gaga'))
+    self.assertEqual([], segmenter.Segment(''))
+    self.assertEqual(None, segmenter.Segment('ng'))
+    self.assertEqual('안녕하세요, ng qq 서울',
+                     segmenter.Unromanize('annyeonghaseyo, ng qq seoul'))
+    self.assertEqual('한구거', segmenter.Unromanize('hangugeo'))
+    segmenter = hangul.RomanizedHangulSegmenter(
+      frequencies={'한': 10, '국': 5, '어': 20})
+    self.assertEqual('한국어', segmenter.Unromanize('hangugeo'))
+
+    # A long run is split without recursion.
+    self.assertEqual('가' * 10000, segmenter.Unromanize('ga' * 10000))
+
+  def testUnromanizeUnbracketedHangulString(self):
+    self.assertEqual('한구거', hangul.UnromanizeUnbracketedHangulString(
+      'hangugeo'))
+    self.assertEqual('한국어', hangul.UnromanizeUnbracketedHangulString(
+      'hangugeo', frequencies={'국': 1}))
+    for hangul_index in range(0, 11172, 41):
+      character = hangul.ChrHangul(hangul_index)
+      romanized = hangul.RomanizeHangulString(character, prefix='',
+                                              postfix='')
+      self.assertEqual(hangul.UnromanizeHangul(romanized,
+                                               hangul.JAMO_ROMANIZATIONS),
+                       hangul.UnromanizeUnbracketedHangulString(romanized))
+
+  def testRomanizeHangulStream(self):
+    self.assertEqual(['[ga][na]\n', 'x[da]\n'],
+                     list(hangul.RomanizeHangulStream(['가나\n', 'x다\n'])))
+    self.assertEqual(['[ga]a', '[na]'],
+                     list(hangul.RomanizeHangulStream(io.StringIO('가a나'),
+                                                      chunk_size=2)))
+    self.assertEqual([], list(hangul.RomanizeHangulStream(io.StringIO(''))))
+
+  def testUnromanizeHangulStream(self):
+    romanized = 'a[ga][x][[na]]ga]\n[da'
+    expected = hangul.UnromanizeHangulString(romanized)
+    for split in range(len(romanized) + 1):
+      chunks = [romanized[:split], romanized[split:]]
+      self.assertEqual(
+        expected, ''.join(hangul.UnromanizeHangulStream(chunks)))
+    self.assertEqual(
+      expected, ''.join(hangul.UnromanizeHangulStream(io.StringIO(romanized),
+                                                      chunk_size=1)))
+
+    romanized = '<<san>><do>><<<<'
+    expected = hangul.UnromanizeHangulString(romanized, prefix='<<',
+                                             postfix='>>')
+    self.assertEqual('산<do>><<<<', expected)
+    for chunk_size in range(1, len(romanized) + 1):
+      self.assertEqual(expected, ''.join(
+        hangul.UnromanizeHangulStream(io.StringIO(romanized), prefix='<<',
+                                      postfix='>>', chunk_size=chunk_size)))
+
+    # Spans are found the same way at any chunk size, even when a postfix
+    # can also start a prefix.
+    for romanized, prefix, postfix in (('<<<<ga>>x<<<do>>>>', '<<', '>>'),
+                                       ('g|a|ga|x|' + 'y' * 20 + '|do|',
+                                        '|', '|'),
+                                       ('abagbaabdoba', 'ab', 'ba'),
+                                       ('gaga[eo[][', '[', '[]')):
+      expected = hangul.UnromanizeHangulString(romanized, prefix=prefix,
+                                               postfix=postfix)
+      for chunk_size in range(1, len(romanized) + 1):
+        self.assertEqual(expected, ''.join(
+          hangul.UnromanizeHangulStream(io.StringIO(romanized), prefix=prefix,
+                                        postfix=postfix,
+                                        chunk_size=chunk_size)))
+    self.assertEqual('<<가x<도>>', hangul.UnromanizeHangulString(
+      '<<<<ga>>x<<<do>>>>', prefix='<<', postfix='>>'))
+    self.assertEqual('gaga어[', ''.join(hangul.UnromanizeHangulStream(
+      ['g', 'aga[e', 'o', '[', ']', '['], prefix='[', postfix='[]')))
+
+    # An unclosed prefix is not held back forever.
+    chunks = hangul.UnromanizeHangulStream(['[' + 'x' * 100, 'y', '[ga]'])
+    self.assertEqual('[' + 'x' * 100, next(chunks))
+
+  def testRomanizeHangulBytes(self):
+    self.assertEqual(bytearray(b'{"a": "[ga][na]"}'),
+                     hangul.RomanizeHangulBytes('{"a": "가나"}'.encode()))
+    self.assertEqual(b'abc', hangul.RomanizeHangulBytes(b'abc'))
+    self.assertEqual(b'', hangul.RomanizeHangulBytes(b''))
+    self.assertEqual('(san)é(do)'.encode(),
+                     hangul.RomanizeHangulBytes(memoryview('산é도'.encode()),
+                                                prefix='(', postfix=')'))
+    out = bytearray(b'>')
+    self.assertIs(out, hangul.RomanizeHangulBytes(
+      memoryview(bytearray('x가'.encode())), out=out))
+    self.assertEqual(b'>x[ga]', out)
+    text = 'a가1 ㄱ 없는 \U0001f600 힣'
+    self.assertEqual(hangul.RomanizeHangulString(text).encode(),
+                     hangul.RomanizeHangulBytes(text.encode()))
+
+  def testSegmentHangul(self):
+    self.assertEqual(
+      [(hangul.SEGMENT_SYLLABLES, 0, 2),
+       (hangul.SEGMENT_OTHER, 2, 5),
+       (hangul.SEGMENT_COMPATIBILITY_JAMOS, 5, 7),
+       (hangul.SEGMENT_CONJOINING_JAMOS, 7, 9),
+       (hangul.SEGMENT_SYLLABLES, 9, 10),
+       (hangul.SEGMENT_OTHER, 10, 11)],
+      list(hangul.SegmentHangul('한국 a ㅋㅋ\u1100\u1161힣\n')))
+    self.assertEqual([], list(hangul.SegmentHangul('')))
+    self.assertEqual([(hangul.SEGMENT_OTHER, 0, 3)],
+                     list(hangul.SegmentHangul('abc')))
+
+  def testIsHangulJamos(self):
+    self.assertEqual(True, hangul.IsHangulJamos('ㄱㅑㅎㅣ'))
+    self.assertEqual(True, hangul.IsHangulJamos(''))
+    self.assertEqual(False, hangul.IsHangulJamos('ㄱ가'))
+    self.assertEqual(False, hangul.IsHangulJamos('ㄱ\n'))
+    self.assertEqual(False, hangul.IsHangulJamos('\u3164'))
+
+  def testSyllablesToConjoiningJamos(self):
+    self.assertEqual('\u1100\u1161\u11ab a\u1100\u1161',
+                     hangul.SyllablesToConjoiningJamos('간 a가'))
+    self.assertEqual('ㄱ', hangul.SyllablesToConjoiningJamos('ㄱ'))
+    for hangul_index in range(0, 11172, 11):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(unicodedata.normalize('NFD', character),
+                       hangul.SyllablesToConjoiningJamos(character))
+
+  def testConjoiningJamosToSyllables(self):
+    self.assertEqual('간 a가', hangul.ConjoiningJamosToSyllables(
+      '\u1100\u1161\u11ab a\u1100\u1161'))
+    self.assertEqual('각', hangul.ConjoiningJamosToSyllables('가\u11a8'))
+    # Jamos which do not make a modern syllable are kept.
+    for string in ('\u1100\u1100', '\u1113\u1161', '각\u11a8', '\u11a8'):
+      self.assertEqual(string, hangul.ConjoiningJamosToSyllables(string))
+    for hangul_index in range(0, 11172, 11):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(character, hangul.ConjoiningJamosToSyllables(
+        unicodedata.normalize('NFD', character)))
+
+  def testSyllablesToCompatibilityJamos(self):
+    self.assertEqual('ㄱㅏㄴ', hangul.SyllablesToCompatibilityJamos('간'))
+    self.assertEqual('ㄱㅏㅄ ㄱㅘ a', hangul.SyllablesToCompatibilityJamos(
+      '값 과 a'))
+    self.assertEqual('', hangul.SyllablesToCompatibilityJamos(''))
 
   def testHasFinalConsonants(self):
     self.assertEqual(False, hangul.HasFinalConsonants('전략가'))
@@ -97,6 +405,24 @@ class TestHangul(unittest.TestCase):
     self.assertEqual(None, hangul.HasFinalConsonants('a'))
     self.assertEqual(None, hangul.HasFinalConsonants(''))
     self.assertEqual(None, hangul.HasFinalConsonants('1'))
+    self.assertEqual(None, hangul.HasFinalConsonants('ㄱ'))
+    for hangul_index in range(0, 11172, 13):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(
+        hangul.DecomposeHangul(character, hangul.JAMO_ROMANIZATIONS)[2] > 0,
+        hangul.HasFinalConsonants(character))
+
+  def testHasFinalConsonantsBytes(self):
+    self.assertEqual(False, hangul.HasFinalConsonantsBytes('전략가'.encode()))
+    self.assertEqual(True, hangul.HasFinalConsonantsBytes(
+      memoryview('수공'.encode())))
+    self.assertEqual(None, hangul.HasFinalConsonantsBytes(b'a'))
+    self.assertEqual(None, hangul.HasFinalConsonantsBytes(b''))
+    self.assertEqual(None, hangul.HasFinalConsonantsBytes('ㄱ'.encode()))
+    for hangul_index in range(0, 11172, 13):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(hangul.HasFinalConsonants(character),
+                       hangul.HasFinalConsonantsBytes(character.encode()))
 
   def testAppendHangulPostfix(self):
     self.assertEqual('전략가를', hangul.AppendHangulPostfix('전략가', '를', '을'))
@@ -108,6 +434,37 @@ class TestHangul(unittest.TestCase):
     # Does not support non-hangul.
     self.assertEqual('m를', hangul.AppendHangulPostfix('m', '를', '을'))
 
+  def testJosaTemplate(self):
+    template = hangul.JosaTemplate('{name}(은/는) {item}(을/를) 샀습니다')
+    self.assertEqual('철수는 책을 샀습니다', template.Format(name='철수', item='책'))
+    self.assertEqual('영민은 사과를 샀습니다',
+                     template.Format(name='영민', item='사과'))
+    self.assertEqual('m는 PC를 샀습니다', template.Format(name='m', item='PC'))
+
+    template = hangul.JosaTemplate('{0}(와/과) {1}(이/가) {2}(으)로 {3}(으로/로)')
+    self.assertEqual('밥과 물이 서울로 집으로',
+                     template.Format('밥', '물', '서울', '집'))
+    self.assertEqual('나와 너가 부산으로 바다로',
+                     template.Format('나', '너', '부산', '바다'))
+
+    template = hangul.JosaTemplate('{user.name!s:>3}(이)다 {{x}}(은/는)')
+    self.assertEqual(' 수공이다 {x}(은/는)', template.Format(user=type(
+      'User', (), {'name': '수공'})))
+    self.assertEqual('', hangul.JosaTemplate('').Format())
+    self.assertEqual('(가/나)', hangul.JosaTemplate('(가/나)').Format())
+    # Unknown pairs and other parentheses are kept as text.
+    self.assertEqual('3(개/명)', hangul.JosaTemplate('{n}(개/명)').Format(n=3))
+    template = hangul.JosaTemplate('{name}(주)에서 {x}(님) {x}(이)로 {y}(이)여')
+    self.assertEqual('삼성(주)에서 철수(님) 철수(이)로 님이여',
+                     template.Format(name='삼성', x='철수', y='님'))
+
+    # Empty field names are numbered automatically.
+    template = hangul.JosaTemplate('{}(은/는) {[0]}(을/를) {name}(이/가)')
+    self.assertEqual('철수는 책을 영희가',
+                     template.Format('철수', ['책'], name='영희'))
+    self.assertRaises(ValueError, hangul.JosaTemplate, '{}(은/는) {0}')
+    self.assertRaises(ValueError, hangul.JosaTemplate, '{0}(은/는) {}')
+
   def testGetInitialCharacter(self):
     self.assertEqual('ㅇ', hangul.GetInitialCharacter('이순신'))
     self.assertEqual('M', hangul.GetInitialCharacter('Michael'))
@@ -118,6 +475,102 @@ class TestHangul(unittest.TestCase):
     self.assertEqual('ㅎ', hangul.GetInitialCharacter('ㅎㅎㅎ'))
     self.assertEqual('ㅜ', hangul.GetInitialCharacter('ㅜㅜ'))
 
+  def testGetInitialCharacters(self):
+    self.assertEqual('ㅇㅅㅅ', hangul.GetInitialCharacters('이순신'))
+    self.assertEqual('MICHAEL', hangul.GetInitialCharacters('Michael'))
+    self.assertEqual('ㄱㅊ 2PM ㅎㅎ', hangul.GetInitialCharacters('김치 2pm ㅎㅎ'))
+    self.assertEqual('', hangul.GetInitialCharacters(''))
+    for hangul_index in range(0, 11172, 37):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(hangul.GetInitialCharacter(character),
+                       hangul.GetInitialCharacters(character))
+
+  def testGetInitialCharacterBytes(self):
+    self.assertEqual('ㅇ'.encode(),
+                     hangul.GetInitialCharacterBytes('이순신'.encode()))
+    self.assertEqual(b'M', hangul.GetInitialCharacterBytes(b'Michael'))
+    self.assertEqual(b'N', hangul.GetInitialCharacterBytes(
+      memoryview(b'nelly')))
+    self.assertEqual(None, hangul.GetInitialCharacterBytes(b''))
+    self.assertEqual('ㅎ'.encode(),
+                     hangul.GetInitialCharacterBytes('ㅎㅎㅎ'.encode()))
+    self.assertEqual('É'.encode(),
+                     hangul.GetInitialCharacterBytes(bytearray('éa'.encode())))
+    # Only the first character is decoded.
+    self.assertEqual('ㅇ'.encode(),
+                     hangul.GetInitialCharacterBytes('이'.encode() + b'\xff'))
+    # Like the python 2 module, other codings and str are accepted.
+    self.assertEqual('ㅇ'.encode('euc-kr'), hangul.GetInitialCharacterBytes(
+      '이순신'.encode('euc-kr'), coding='euc-kr'))
+    self.assertEqual('ㅇ'.encode(), hangul.GetInitialCharacterBytes('이순신'))
+    self.assertEqual(None, hangul.GetInitialCharacterBytes(''))
+    for hangul_index in range(0, 11172, 37):
+      character = hangul.ChrHangul(hangul_index)
+      self.assertEqual(hangul.GetInitialCharacter(character).encode(),
+                       hangul.GetInitialCharacterBytes(character.encode()))
+
+  def testHangulSortKey(self):
+    words = ['하늘', 'apple', 'Banana', '가', 'ㄱ', '각', '갂', '나', '2PM',
+             'ㅏ', '아', '안', 'ㅎ', '가나', '가 나', '!', 'banana', '']
+    self.assertEqual(
+      ['', 'ㄱ', '가', '가 나', '가나', '각', '갂', '나', 'ㅏ', '아', '안', 'ㅎ',
+       '하늘', 'apple', 'Banana', 'banana', '2PM', '!'],
+      sorted(words, key=hangul.HangulSortKey))
+    self.assertIsInstance(hangul.HangulSortKey('가'), bytes)
+    self.assertLess(hangul.HangulSortKey('\U0001f600'),
+                    hangul.HangulSortKey('\U0001f601'))
+    # Only ASCII letters are Latin. İ lowers to 2 characters.
+    self.assertLess(hangul.HangulSortKey('Zebra'),
+                    hangul.HangulSortKey('İstanbul'))
+
+  def testGroupByInitialCharacter(self):
+    self.assertEqual(
+      {'ㅇ': ['이순신', '아'], 'M': ['Michael', 'mary'], 'ㄱ': ['김치국'],
+       None: ['']},
+      hangul.GroupByInitialCharacter(['이순신', 'Michael', '김치국', '', 'mary',
+                                      '아']))
+    self.assertEqual({}, hangul.GroupByInitialCharacter([]))
+
+  def testInstrumentation(self):
+    original = hangul.RomanizeHangulString
+    records = []
+    instrumentation = hangul.EnableInstrumentation(
+      lambda *record: records.append(record))
+    try:
+      self.assertIs(instrumentation, hangul.GetInstrumentation())
+      self.assertIsNot(original, hangul.RomanizeHangulString)
+      self.assertEqual('[ga]a', hangul.RomanizeHangulString('가a'))
+      self.assertEqual('가[x][g]', hangul.UnromanizeHangulString('[ga][x][g]'))
+      self.assertEqual('[가]', hangul.UnromanizeHangulString('[[ga]]'))
+      self.assertEqual(None, hangul.UnromanizeHangul('x',
+                                                     hangul.JAMO_ROMANIZATIONS))
+      hangul.AppendHangulPostfix('수공', '를', '을')
+    finally:
+      hangul.DisableInstrumentation()
+    self.assertIs(original, hangul.RomanizeHangulString)
+    self.assertEqual(None, hangul.GetInstrumentation())
+
+    snapshot = instrumentation.Snapshot()
+    self.assertEqual(
+      {'calls': 1, 'characters': 2, 'hangul_characters': 1,
+       'failed_unromanizations': 0},
+      dict((key, value)
+           for key, value in snapshot['RomanizeHangulString'].items()
+           if key != 'seconds'))
+    self.assertEqual(0.5, instrumentation.HangulRatio('RomanizeHangulString'))
+    self.assertEqual(2, snapshot['UnromanizeHangulString'][
+      'failed_unromanizations'])
+    self.assertEqual(1, snapshot['UnromanizeHangul']['failed_unromanizations'])
+    self.assertEqual(2, snapshot['UnromanizeHangulString']['calls'])
+    # Calls inside another instrumented call are not recorded.
+    self.assertEqual(1, snapshot['AppendHangulPostfix']['calls'])
+    self.assertNotIn('HasFinalConsonants', snapshot)
+    self.assertEqual(5, len(records))
+    self.assertEqual('RomanizeHangulString', records[0][0])
+
+    # Disabling twice is harmless.
+    hangul.DisableInstrumentation()
+
 
 if __name__ == '__main__':
   unittest.main()
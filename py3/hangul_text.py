@@ -0,0 +1,154 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+"""Compact array-backed hangul text with jamo index planes."""
+
+import array
+import re
+import sys
+
+import hangul
+
+NUM_CHARACTERS = (hangul.NUM_JAMOS[0] * hangul.NUM_JAMOS[1] *
+                  hangul.NUM_JAMOS[2])
+
+_FIRST_ORD = ord(hangul.FIRST_HANGUL_CHARACTER)
+
+# Code points are stored in 2 bytes unless the text has characters beyond the
+# basic multilingual plane. Lone surrogates are stored as they are.
+_ENCODINGS = {'H': 'utf-16-' + sys.byteorder[0] + 'e',
+              'I': 'utf-32-' + sys.byteorder[0] + 'e'}
+
+# A lone high surrogate followed by a lone low surrogate would be decoded from
+# UTF-16 as one character, so such text takes 4 bytes per character.
+_SURROGATE_PAIR = re.compile('[\ud800-\udbff][\udc00-\udfff]')
+
+# Jamo indexes of non-hangul characters, which are -1 as signed bytes.
+_NON_HANGUL_JAMOS = '\xff\xff\xff'
+
+
+class _JamoIndexTable(dict):
+  """str.translate() table from characters to 3 jamo index characters."""
+
+  def __missing__(self, character_ord):
+    # Remember non-hangul characters so that each is looked up only once.
+    self[character_ord] = _NON_HANGUL_JAMOS
+    return _NON_HANGUL_JAMOS
+
+
+_jamo_index_table = None
+
+
+def _JamoIndexes(unicode_string):
+  """Return bytes of initial, medial and final indexes of each character."""
+  global _jamo_index_table
+  if _jamo_index_table is None:
+    table = _JamoIndexTable()
+    for hangul_index in range(NUM_CHARACTERS):
+      table[_FIRST_ORD + hangul_index] = ''.join(
+        map(chr, hangul.DecomposeHangulIndex(hangul_index, hangul.NUM_JAMOS)))
+    _jamo_index_table = table
+  return unicode_string.translate(_jamo_index_table).encode('latin-1')
+
+
+class HangulText(object):
+  """Text stored as an array of code points.
+
+  Each character takes 2 bytes, or 4 bytes if the text has characters beyond
+  U+FFFF, instead of a Python object. The initial, medial and final jamo
+  indexes of the whole text are computed on first use into signed byte arrays
+  called planes, with -1 for non-hangul characters. The planes are shared
+  through read-only memoryviews without copying.
+
+    text = HangulText('한국 a')
+    text.finals.tolist()  # [4, 1, -1, -1]
+    text.HasFinalConsonant(0)  # True
+  """
+
+  __slots__ = ('code_points', '_planes')
+
+  def __init__(self, unicode_string=''):
+    """Pack a string, or take over an array of code points as it is."""
+    if isinstance(unicode_string, array.array):
+      self.code_points = unicode_string
+    else:
+      typecode = 'H' if unicode_string.isascii() or (
+        max(unicode_string) <= '\uffff' and
+        not _SURROGATE_PAIR.search(unicode_string)) else 'I'
+      self.code_points = array.array(typecode)
+      self.code_points.frombytes(
+        unicode_string.encode(_ENCODINGS[typecode], 'surrogatepass'))
+    self._planes = None
+
+  def __len__(self):
+    return len(self.code_points)
+
+  def __str__(self):
+    return self.code_points.tobytes().decode(
+      _ENCODINGS[self.code_points.typecode], 'surrogatepass')
+
+  def __repr__(self):
+    return 'HangulText(%r)' % str(self)
+
+  def __eq__(self, other):
+    if isinstance(other, HangulText):
+      return str(self) == str(other)
+    return NotImplemented
+
+  def __hash__(self):
+    return hash(str(self))
+
+  def __getitem__(self, index):
+    """Return a character, or a HangulText for a slice.
+
+    A slice keeps the slices of planes which are already computed.
+    """
+    if isinstance(index, slice):
+      text = HangulText(self.code_points[index])
+      if self._planes is not None:
+        text._planes = tuple(plane[index] for plane in self._planes)
+      return text
+    return chr(self.code_points[index])
+
+  def _Planes(self):
+    if self._planes is None:
+      jamo_indexes = _JamoIndexes(str(self))
+      self._planes = tuple(array.array('b', jamo_indexes[family::3])
+                           for family in range(3))
+    return self._planes
+
+  @property
+  def initials(self):
+    """Read-only memoryview of initial jamo indexes."""
+    return memoryview(self._Planes()[0]).toreadonly()
+
+  @property
+  def medials(self):
+    """Read-only memoryview of medial jamo indexes."""
+    return memoryview(self._Planes()[1]).toreadonly()
+
+  @property
+  def finals(self):
+    """Read-only memoryview of final jamo indexes, 0 for no final."""
+    return memoryview(self._Planes()[2]).toreadonly()
+
+  def IsHangul(self, index):
+    """Return True if the character at index is a hangul syllable."""
+    return 0 <= self.code_points[index] - _FIRST_ORD < NUM_CHARACTERS
+
+  def HasFinalConsonant(self, index):
+    """Return True if the character at index has a final consonant.
+
+    This does not need the planes. Non-hangul characters give False.
+    """
+    hangul_index = self.code_points[index] - _FIRST_ORD
+    return (0 <= hangul_index < NUM_CHARACTERS and
+            hangul_index % hangul.NUM_JAMOS[2] != 0)
+
+  def JamoIndexes(self, index):
+    """Return (initial, medial, final) at index, or None for non-hangul."""
+    hangul_index = self.code_points[index] - _FIRST_ORD
+    if 0 <= hangul_index < NUM_CHARACTERS:
+      return hangul.DecomposeHangulIndex(hangul_index, hangul.NUM_JAMOS)
+    return None
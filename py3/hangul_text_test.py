@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 by Jaehyun Yeom
+
+import unittest
+import hangul
+import hangul_text
+
+
+class TestHangulText(unittest.TestCase):
+  """Return value of each test is on the left side."""
+
+  def testHangulText(self):
+    text = hangul_text.HangulText('한국 a')
+    self.assertEqual(4, len(text))
+    self.assertEqual('한국 a', str(text))
+    self.assertEqual('H', text.code_points.typecode)
+    self.assertEqual('국', text[1])
+    self.assertEqual(hangul_text.HangulText('국 '), text[1:3])
+    self.assertEqual(hangul_text.HangulText(''), hangul_text.HangulText())
+
+    text = hangul_text.HangulText('가\U0001f600각')
+    self.assertEqual('I', text.code_points.typecode)
+    self.assertEqual('가\U0001f600각', str(text))
+    self.assertEqual('\U0001f600', text[1])
+
+    # Lone surrogates are kept, even when they look like a pair in UTF-16.
+    for string, typecode in (('a\ud800b', 'H'), ('\udc00한', 'H'),
+                             ('가\ud83d\ude00', 'I')):
+      text = hangul_text.HangulText(string)
+      self.assertEqual(typecode, text.code_points.typecode)
+      self.assertEqual(len(string), len(text))
+      self.assertEqual(string, str(text))
+      self.assertEqual(string[1], text[1])
+    self.assertEqual([-1, 18], hangul_text.HangulText(
+      '\udc00한').initials.tolist())
+
+  def testPlanes(self):
+    text = hangul_text.HangulText('한국 a')
+    self.assertEqual([18, 0, -1, -1], text.initials.tolist())
+    self.assertEqual([0, 13, -1, -1], text.medials.tolist())
+    self.assertEqual([4, 1, -1, -1], text.finals.tolist())
+    self.assertTrue(text.finals.readonly)
+    self.assertEqual([1, -1], text[1:3].finals.tolist())
+    self.assertEqual([], hangul_text.HangulText().initials.tolist())
+
+    characters = ''.join(hangul.ChrHangul(hangul_index)
+                         for hangul_index in range(0, 11172, 7)) + 'ㄱa'
+    text = hangul_text.HangulText(characters)
+    planes = (text.initials, text.medials, text.finals)
+    for index, character in enumerate(characters):
+      jamo_indexes = hangul.DecomposeHangul(character,
+                                            hangul.JAMO_ROMANIZATIONS)
+      self.assertEqual(jamo_indexes or (-1, -1, -1),
+                       tuple(plane[index] for plane in planes))
+      self.assertEqual(jamo_indexes, text.JamoIndexes(index))
+
+  def testPredicates(self):
+    text = hangul_text.HangulText('전략가 a힣')
+    self.assertEqual([True, True, True, False, False, True],
+                     [text.IsHangul(index) for index in range(len(text))])
+    self.assertEqual([True, True, False, False, False, True],
+                     [text.HasFinalConsonant(index)
+                      for index in range(len(text))])
+    self.assertEqual(None, text.JamoIndexes(4))
+
+
+if __name__ == '__main__':
+  unittest.main()